@@ -1,83 +1,43 @@
 import streamlit as st
 import pandas as pd
 
-def display_polymer_info(df, category, grade):
-    """
-    Display polymer info in a custom-styled HTML table in Streamlit.
-    Filters based on Polymer Category and Polymer Grade.
-    Hides index and only shows non-empty fields.
-    Includes a third column with links.
-    """
+# Fields shown in the Details panel, in order
+COLUMNS_TO_SHOW = [
+    "Cost_Notes", "Volume Available", "TUV Home", "TUV Industrial", "BPI", 
+    "BBC_Notes", "LCA (kg CO₂-eq)", "WVTR - Published Data", "WVTR_Conditions",
+    "WVTR_Thickness (µm)", "WVTR_Standard", "WVTR_Notes", "Visual Appearance",
+    "FDA or equivalent", "RoHS & REACH", "Europe Policy Considerations",
+    "Asia Policy Considerations", "Production Methods", "CFE_Notes", "SC_Notes","Melt temperature (°C)"
+]
 
-    # Define relevant fields
-    columns_to_show = [
-        "Cost_Notes", "Volume Available", "TUV Home", "TUV Industrial", "BPI", 
-        "BBC_Notes", "LCA (kg CO₂-eq)", "WVTR - Published Data", "WVTR_Conditions",
-        "WVTR_Thickness (µm)", "WVTR_Standard", "WVTR_Notes", "Visual Appearance",
-        "FDA or equivalent", "RoHS & REACH", "Europe Policy Considerations",
-        "Asia Policy Considerations", "Production Methods", "CFE_Notes", "SC_Notes","Melt temperature (°C)"
-    ]
-
-    # Filter valid columns that exist
-    valid_columns = [col for col in columns_to_show if col in df.columns]
-
-    # Filter DataFrame
-    filtered_df = df[
-        (df["Polymer Category"] == category) &
-        (df["Polymer Grade"] == grade)
-    ]
-
-    if filtered_df.empty:
-        st.warning(f"No data found for category '{category}' and grade '{grade}'.")
-        return
+# dictionary of links and column related
+LINK_COLUMNS = {
+    "Cost_Notes": "Cost",
+    "Volume Available": "Volume",
+    "TUV Home": "TUV",
+    "TUV Industrial": "TUV",
+    "BPI": "BPI",
+    "BBC_Notes": "BBC",
+    "LCA (kg CO₂-eq)": "LCA_Link",
+    "WVTR - Published Data": "WVTR_Link",
+    "WVTR_Conditions": "WVTR",
+    "WVTR_Thickness (µm)": "WVTR",
+    "WVTR_Standard": "WVTR",
+    "WVTR_Notes": "WVTR",
+    "Visual Appearance": "Visual Appearance_Link",
+    "FDA or equivalent": "FDA or equivalent_Link",
+    "RoHS & REACH": "RoHS & REACH_Link",
+    "Europe Policy Considerations": "Policy",
+    "Asia Policy Considerations": "Policy",
+    "Production Methods": "Production",
+    "CFE_Notes": "CFE_Link",
+    "SC_Notes": "SC_Link",
+    "Melt temperature (°C)": "Melt temperature link"
+}
 
-    # Extract first match and clean up empty values
-    row = filtered_df.iloc[0][valid_columns]
-    clean_row = row.dropna()
-    clean_row = clean_row[clean_row.astype(str).str.strip() != ""]
-
-    if clean_row.empty:
-        st.info("No non-empty details available for the selected polymer.")
-        return
 
-    # Build HTML table manually with 3 columns
-    html_rows = ""
-    full_row = filtered_df.iloc[0]  # full row for access to *_Link fields
-
-
-    # dictionary of links and column related
-    link_columns = {
-        "Cost_Notes": "Cost",
-        "Volume Available": "Volume",
-        "TUV Home": "TUV",
-        "TUV Industrial": "TUV",
-        "BPI": "BPI",
-        "BBC_Notes": "BBC",
-        "LCA (kg CO₂-eq)": "LCA_Link",
-        "WVTR - Published Data": "WVTR_Link",
-        "WVTR_Conditions": "WVTR",
-        "WVTR_Thickness (µm)": "WVTR",
-        "WVTR_Standard": "WVTR",
-        "WVTR_Notes": "WVTR",
-        "Visual Appearance": "Visual Appearance_Link",
-        "FDA or equivalent": "FDA or equivalent_Link",
-        "RoHS & REACH": "RoHS & REACH_Link",
-        "Europe Policy Considerations": "Policy",
-        "Asia Policy Considerations": "Policy",
-        "Production Methods": "Production",
-        "CFE_Notes": "CFE_Link",
-        "SC_Notes": "SC_Link",
-        "Melt temperature (°C)": "Melt temperature link"
-    }
-
-    for key, value in clean_row.items():
-        #link_col = f"{key}_Link"
-        link_col = link_columns[key]
-        link = full_row[link_col] if link_col in full_row and pd.notna(full_row[link_col]) and str(full_row[link_col]).strip() else ""
-        link_html = f"<a href='{link}' target='_blank'>View</a>" if link else "—"
-        html_rows += f"<tr><td><strong>{key}</strong></td><td>{value}</td><td>{link_html}</td></tr>"
-
-    html_table = f"""
+def _render_details_table(html_rows):
+    return f"""
     <div style='margin-top: 20px; overflow-x: auto;'>
     <table style='width: 100%; border-collapse: collapse; font-family: Arial, sans-serif;'>
         <thead>
@@ -94,5 +54,77 @@ def display_polymer_info(df, category, grade):
     </div>
     """
 
+
+def build_detail_index(df):
+    """
+    Pre-renders the Details table of every (Polymer Category, Polymer Grade).
+    Empty values are dropped and links resolved column by column over the
+    whole sheet, so each record is cleaned once rather than per panel.
+
+    Returns:
+        dict: (category, grade) -> HTML table, or None when the grade has
+        no non-empty details. The first row wins for duplicate keys.
+    """
+    valid_columns = [col for col in COLUMNS_TO_SHOW if col in df.columns]
+
+    present = {}
+    links = {}
+    for col in valid_columns:
+        values = df[col]
+        present[col] = (values.notna() & (values.astype(str).str.strip() != "")).to_numpy()
+
+        link_col = LINK_COLUMNS[col]
+        if link_col in df.columns:
+            link = df[link_col]
+            has_link = (link.notna() & (link.astype(str).str.strip() != "")).to_numpy()
+            links[col] = [f"<a href='{v}' target='_blank'>View</a>" if ok else "—" for v, ok in zip(link, has_link)]
+        else:
+            links[col] = ["—"] * len(df)
+
+    index = {}
+    keys = zip(df["Polymer Category"], df["Polymer Grade"])
+    for position, key in enumerate(keys):
+        if key in index or pd.isna(key[0]) or pd.isna(key[1]):
+            continue
+        html_rows = ""
+        for col in valid_columns:
+            if present[col][position]:
+                value = df[col].iat[position]
+                html_rows += f"<tr><td><strong>{col}</strong></td><td>{value}</td><td>{links[col][position]}</td></tr>"
+        index[key] = _render_details_table(html_rows) if html_rows else None
+    return index
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def cached_detail_index(_df, catalog_version):
+    """
+    build_detail_index, built once per catalog version and shared by all
+    sessions.
+    """
+    return build_detail_index(_df)
+
+
+def display_polymer_info(df, category, grade, catalog_version=None):
+    """
+    Display polymer info in a custom-styled HTML table in Streamlit.
+    Looks the record up by Polymer Category and Polymer Grade in the
+    detail index of the catalog version (built on first use).
+    Hides index and only shows non-empty fields.
+    Includes a third column with links.
+    """
+    if catalog_version is None:
+        index = build_detail_index(df)
+    else:
+        index = cached_detail_index(df, catalog_version)
+
+    if (category, grade) not in index:
+        st.warning(f"No data found for category '{category}' and grade '{grade}'.")
+        return
+
+    html_table = index[(category, grade)]
+    if html_table is None:
+        st.info("No non-empty details available for the selected polymer.")
+        return
+
     st.markdown("### Additional details:", unsafe_allow_html=True)
     st.markdown(html_table, unsafe_allow_html=True)
@@ -2,7 +2,9 @@
 import streamlit as st
 st.set_page_config(layout="wide")
 
-from app.pages import input_page, output_page
+# The output page (plotting, export, LLM and AWS clients) is imported only
+# when it is shown, so the login and input pages render without it
+from app.pages import input_page
 from auth import login
 
 # st.set_page_config(layout="wide")
@@ -20,4 +22,5 @@ elif "page" not in st.session_state:
 if st.session_state.get("user") and st.session_state.page == "Input":
     input_page.show()
 elif st.session_state.get("user"):
+    from app.pages import output_page
     output_page.show()
\ No newline at end of file
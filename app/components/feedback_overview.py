@@ -0,0 +1,32 @@
+import streamlit as st
+
+from feedback_store import get_feedback_store
+
+ADMIN_USERS = {"Admin"}
+
+
+def render_feedback_overview():
+    """
+    Admin summary of the collected feedback, served from the indexed
+    feedback store; new feedback files are picked up at most once a minute.
+    """
+    store = get_feedback_store()
+    if st.button("🔄 Refresh feedback", key="feedback_overview_refresh"):
+        store.ingest()
+    else:
+        store.ingest_if_stale()
+
+    summary = store.score_summary()
+    cols = st.columns(3)
+    cols[0].metric("Surveys", int(summary.at[0, "surveys"]))
+    cols[1].metric("Mean recommendation", summary.at[0, "mean_recommendation"])
+    cols[2].metric("Mean DOE relevance", summary.at[0, "mean_doe_relevance"])
+
+    st.markdown("**Feedback per polymer**")
+    st.dataframe(store.polymer_feedback_counts(), hide_index=True)
+
+    st.markdown("**Scores per user**")
+    st.dataframe(store.score_summary(by_user=True), hide_index=True)
+
+    st.markdown("**Recent comments**")
+    st.dataframe(store.recent_comments(limit=20), hide_index=True)
@@ -0,0 +1,27 @@
+import streamlit as st
+
+from rule_based_insight import figure_cache_info
+from shared_data import session_memory_report, shared_memory_report
+
+
+def _with_mb(df):
+    return df.assign(MB=(df["bytes"] / 2**20).round(2))
+
+
+def render_memory_report():
+    """
+    Admin readout of the memory held by the process-wide shared data and by
+    each recently active session's state.
+    """
+    shared = shared_memory_report()
+    sessions = session_memory_report()
+    cols = st.columns(3)
+    cols[0].metric("Shared data (MB)", round(shared["bytes"].sum() / 2**20, 2))
+    cols[1].metric("Active sessions", len(sessions))
+    cols[2].metric("Session state (MB)", round(sessions["bytes"].sum() / 2**20, 2))
+
+    st.markdown("**Shared objects**")
+    st.dataframe(_with_mb(shared), hide_index=True)
+    st.markdown("**Sessions**")
+    st.dataframe(_with_mb(sessions), hide_index=True)
+    st.caption("Degradation figure cache: {size}/{maxsize} figures, {hits} hits, {misses} misses".format(**figure_cache_info()))
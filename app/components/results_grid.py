@@ -0,0 +1,302 @@
+import hashlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from additional_details import display_polymer_info
+from feedback_log import log_feedback, make_record
+from feedback_uploader import enqueue_uploads
+from rule_based_insight import plot_ingredient, show_polymer_blend_insights
+
+PAGE_SIZES = [10, 25, 50, 100]
+# Session-state entry holding the per-row UI state of the results table
+UI_STATE_KEY = "results_ui"
+
+# Columns rendered as widgets rather than HTML cells
+WIDGET_COLUMNS = ["Feedback", "Details", "Insights"]
+# Columns shown without pass/fail colouring
+NEUTRAL_COLUMNS = ["Polymer Category", "Polymer Grade", "Score", "Type of Polymer", "Supplier"]
+# Cells rendered as links, and the column holding each link
+LINK_COLUMNS = {
+    "Polymer Grade": "Polymer Grade_Link",
+    "Cost": "Cost_Link",
+    "BBC": "BBC_Link",
+    "Tensile Strength": "Tensile Strength (MPa)_Link",
+    "Elongation at Break": "Elongation at break (%)_Link",
+}
+MISSING_LINK = "https://www.planeterthos.com/404"
+
+PASS_COLOR = "#1f3b1f"
+FAIL_COLOR = "#3b1f1f"
+NEUTRAL_COLOR = "#111"
+
+# Shared styling for every cell; each cell only carries its colour
+TABLE_CSS = """
+<style>
+.pg-link { display: inline-block; text-decoration: none; color: #eee; font-weight: bold;
+           padding: 6px 10px; border-radius: 6px; text-align: center; }
+.pg-cell { border: 1px solid #555; padding: 10px; color: #eee; }
+</style>
+"""
+
+
+def paginate(total_rows, key_prefix="results"):
+    """
+    Page size and page selectors for the results table.
+
+    Returns:
+        tuple: (start, end) positions of the rows on the current page.
+    """
+    size_key = f"{key_prefix}_page_size"
+    page_key = f"{key_prefix}_page"
+
+    size_col, page_col, info_col = st.columns([1, 1, 4])
+    page_size = size_col.selectbox("Rows per page", PAGE_SIZES, key=size_key)
+    page_count = max(1, -(-total_rows // page_size))
+
+    # A re-rank or a bigger page size can leave the stored page out of range
+    if st.session_state.get(page_key, 1) > page_count:
+        st.session_state[page_key] = page_count
+    page = page_col.number_input("Page", min_value=1, max_value=page_count, step=1, key=page_key)
+
+    start = (page - 1) * page_size
+    end = min(start + page_size, total_rows)
+    info_col.caption(f"Showing {start + 1 if total_rows else 0}–{end} of {total_rows} polymers · page {page} of {page_count}")
+    return start, end
+
+
+def polymer_ids(df):
+    """
+    Stable row IDs for the results table, derived from the polymer category
+    and grade, so per-row UI state survives re-ranks that reorder the rows.
+
+    Returns:
+        pd.Series: Short hex IDs with the same index as df.
+    """
+    names = df["Polymer Category"].astype(str) + "\x1f" + df["Polymer Grade"].astype(str)
+    ids = names.map(lambda name: hashlib.sha1(name.encode("utf-8")).hexdigest()[:12])
+    # Repeated category/grade pairs get a suffix by order of appearance
+    repeat = ids.groupby(ids).cumcount()
+    return ids.where(repeat == 0, ids + "-" + repeat.astype(str))
+
+
+def get_ui_state():
+    """
+    This session's results-table UI state: the polymer IDs with an open
+    Details or Insights panel and the unsent feedback drafts by polymer ID.
+    """
+    return st.session_state.setdefault(UI_STATE_KEY, {"details": set(), "insights": set(), "drafts": {}})
+
+
+def prune_ui_state(ui_state, live_ids):
+    """
+    Drops UI state of polymers that are no longer in the results.
+
+    Parameters:
+        ui_state (dict): From get_ui_state.
+        live_ids (iterable): IDs of the rows currently ranked.
+    """
+    live_ids = set(live_ids)
+    ui_state["details"] &= live_ids
+    ui_state["insights"] &= live_ids
+    for pid in ui_state["drafts"].keys() - live_ids:
+        del ui_state["drafts"][pid]
+
+
+def _save_draft(ui_state, pid, widget_key):
+    text = st.session_state.get(widget_key, "")
+    if text:
+        ui_state["drafts"][pid] = text
+    else:
+        ui_state["drafts"].pop(pid, None)
+
+
+def _cell_colors(df, col_name):
+    if col_name in NEUTRAL_COLUMNS:
+        return pd.Series(NEUTRAL_COLOR, index=df.index)
+    check_col = f"{col_name}_Check"
+    if check_col not in df.columns:
+        return pd.Series(FAIL_COLOR, index=df.index)
+    passed = df[check_col].fillna(False).astype(bool).to_numpy()
+    return pd.Series(np.where(passed, PASS_COLOR, FAIL_COLOR), index=df.index)
+
+
+def _cell_links(df, col_name):
+    links = df[LINK_COLUMNS[col_name]] if LINK_COLUMNS[col_name] in df.columns else pd.Series(np.nan, index=df.index)
+    valid = links.map(lambda link: isinstance(link, str) and link.startswith("http"), na_action="ignore")
+    return links.where(valid.fillna(False).astype(bool), MISSING_LINK)
+
+
+def render_table_cells(combined_df, main_columns):
+    """
+    Builds the HTML of every non-widget cell of the ranked table in one
+    pass, column by column.
+
+    Parameters:
+        combined_df (pd.DataFrame): Ranked biopolymers followed by benchmarks.
+        main_columns (list): Columns shown in the table, in order.
+
+    Returns:
+        pd.DataFrame: Cell HTML with the same index as combined_df.
+    """
+    cells = {}
+    for col_name in main_columns:
+        if col_name in WIDGET_COLUMNS:
+            continue
+        text = combined_df[col_name].astype(str).fillna("nan")
+        colors = _cell_colors(combined_df, col_name)
+        if col_name in LINK_COLUMNS:
+            cells[col_name] = (
+                '<a class="pg-link" href="' + _cell_links(combined_df, col_name) + '" target="_blank" '
+                'style="background-color: ' + colors + ';">' + text + '</a>'
+            )
+        else:
+            cells[col_name] = '<div class="pg-cell" style="background-color: ' + colors + ';">' + text + '</div>'
+    return pd.DataFrame(cells, index=combined_df.index)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_table_cells(_combined_df, main_columns, catalog_version, filters_hash):
+    """
+    render_table_cells, reused across reruns while the catalog version and
+    filters (which fully determine the ranked table) stay the same.
+    """
+    return render_table_cells(_combined_df, list(main_columns))
+
+
+def render_header(main_columns, column_labels):
+    header_cols = st.columns(len(main_columns))
+    for i, col_name in enumerate(main_columns):
+        label = column_labels.get(col_name, col_name)
+        header_cols[i].markdown(
+            f"""
+            <div style="
+                display: flex;
+                flex-direction: column;
+                justify-content: space-between;
+                align-items: center;
+                height: 70px;
+                color: #eee;
+                font-weight: 600;
+                font-size: 0.95rem;
+                text-align: center;
+                padding: 0 4px;
+            ">
+                <div style="line-height: 1.2em;">{label}</div>
+                <div style="width: 100%; border-top: 4px solid #8942E5; margin-top: 0.5rem;"></div>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+
+    # for i, col_name in enumerate(main_columns):
+    #     label = column_labels.get(col_name, col_name)
+    #     header_cols[i].markdown(
+    #         f"""
+    #         <div style='text-align:center; color:#eee; font-weight:600; font-size:0.95rem; padding-bottom:0.2rem;'>
+    #             {label}
+    #             <hr style='border: 2px solid #8942E5; margin: 0.4rem 0 0 0;' />
+    #         </div>
+    #         """,
+    #         unsafe_allow_html=True
+    #     )
+
+
+def render_row(idx, pid, row, main_columns, cells, df_total, bio_count, catalog_version, ui_state):
+    feedback_key = f"feedback_{pid}"
+    with st.container():
+        st.markdown("<div style='margin-bottom: 16px;'>", unsafe_allow_html=True)
+        display_cols = st.columns(len(main_columns))
+        for i, col_name in enumerate(main_columns):
+            if col_name == "Feedback":
+
+                #popover for feedback
+                with display_cols[i].popover("Feedback"):
+                    st.text_input("Feedback", value=ui_state["drafts"].get(pid, ""), key=feedback_key,
+                                  on_change=_save_draft, args=(ui_state, pid, feedback_key),
+                                  label_visibility="collapsed", placeholder="Write here...")
+                    if st.button("Submit Feedback", key=f"submit_{pid}"):
+                        # log the feedback locally and queue the text for upload to s3
+                        user = st.session_state.get("user", "anonymous")
+                        ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+                        feedback = ui_state["drafts"].get(pid, "")
+                        log_feedback([make_record(
+                            user, "polymer",
+                            polymer_category=row['Polymer Category'],
+                            polymer_grade=row['Polymer Grade'],
+                            text=feedback,
+                        )])
+
+                        #upload to s3 in the user folder in the folder feedback_for_Polymers
+                        object_key = f"{user}/feedback_for_Polymers/{row['Polymer Category']}_{row['Polymer Grade']}_{idx}_{ts}.txt"
+                        enqueue_uploads([{"body": feedback, "key": object_key}])
+
+                        #success message
+                        st.success("Feedback submitted")
+
+
+            elif col_name == "Details":
+                if display_cols[i].button("Details", key=f"details_{pid}"):
+                    ui_state["details"] ^= {pid}
+            elif col_name == "Insights":
+                if display_cols[i].button("Insights", key=f"insights_{pid}"):
+                    ui_state["insights"] ^= {pid}
+
+            else:
+                display_cols[i].markdown(cells.at[idx, col_name], unsafe_allow_html=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    if pid in ui_state["details"]:
+
+        st.markdown(f"### Compostability data for {row['Polymer Category']}:", unsafe_allow_html=True)
+
+        plot_ingredient("./data/Bio_Dis_Data.xlsx",row["Polymer Category"])
+
+        display_polymer_info(df_total, row["Polymer Category"], row["Polymer Grade"], catalog_version)
+
+        # st.markdown("### Additional details:", unsafe_allow_html=True)
+        # st.markdown(html_table, unsafe_allow_html=True)  # ✅ Important!
+
+
+
+    if pid in ui_state["insights"]:
+        st.markdown(f"### Insights for {row['Polymer Category']}")
+
+        key = row["Polymer Category"] + row["Polymer Grade"]
+
+        show_polymer_blend_insights(row["Polymer Category"],key)
+
+
+
+    if idx + 1 == bio_count:
+        st.markdown("<hr style='border: 1px dashed #444;'>", unsafe_allow_html=True)
+
+
+def render_results_grid(combined_df, main_columns, column_labels, df_total, bio_count, catalog_version, filters_hash):
+    """
+    Renders the ranked results one page at a time, so the widgets sent to
+    the browser scale with the page size rather than the catalog size.
+
+    Parameters:
+        combined_df (pd.DataFrame): Ranked biopolymers followed by benchmarks.
+        main_columns (list): Columns shown in the table, in order.
+        column_labels (dict): Header label per column.
+        df_total (pd.DataFrame): Full catalog sheet for the Details panel.
+        bio_count (int): Number of biopolymer rows at the top of combined_df.
+        catalog_version (str): Version of the loaded catalog.
+        filters_hash (str): scoring.filters_key of the active filters.
+    """
+    cells = cached_table_cells(combined_df, tuple(main_columns), catalog_version, filters_hash)
+    st.markdown(TABLE_CSS, unsafe_allow_html=True)
+
+    # Row state is keyed by polymer ID; forget rows the ranking no longer has
+    ids = polymer_ids(combined_df)
+    ui_state = get_ui_state()
+    prune_ui_state(ui_state, ids)
+
+    start, end = paginate(len(combined_df))
+    render_header(main_columns, column_labels)
+    for idx, row in combined_df.iloc[start:end].iterrows():
+        render_row(idx, ids.at[idx], row, main_columns, cells, df_total, bio_count, catalog_version, ui_state)
@@ -0,0 +1,172 @@
+import os
+from datetime import datetime
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from feedback_log import FEEDBACK_ROOT
+
+# Above WEBGL_POINTS points the scatter is drawn with WebGL instead of SVG
+# markers; above DENSITY_POINTS it becomes a binned density view with a
+# sample of hoverable points on top.
+WEBGL_POINTS = int(os.getenv("SCATTER_WEBGL_POINTS", 1000))
+DENSITY_POINTS = int(os.getenv("SCATTER_DENSITY_POINTS", 20000))
+DENSITY_BINS = 80
+DENSITY_SAMPLE = 2000       # hoverable points per polymer type in the density view
+HOVER_DATA = {"Polymer Category": True, "Polymer Grade": True}
+
+
+def scatter_mode(point_count):
+    """
+    "svg", "webgl" or "density" for a scatter of point_count points.
+    """
+    if point_count > DENSITY_POINTS:
+        return "density"
+    if point_count > WEBGL_POINTS:
+        return "webgl"
+    return "svg"
+
+
+def _sample_per_type(df, limit, seed=0):
+    # Every polymer type keeps up to limit points, so the few benchmarks
+    # are never sampled away by thousands of biopolymers
+    shuffled = df.sample(frac=1, random_state=seed)
+    return shuffled.groupby("Type of Polymer", dropna=False, sort=False).head(limit)
+
+
+def _bin_centres(series):
+    # Numeric axes are cut into DENSITY_BINS equal bins, each value mapped
+    # to its bin centre; other axes keep their categories
+    if not pd.api.types.is_numeric_dtype(series):
+        return series.astype(str).to_numpy()
+    values = series.to_numpy(dtype=float)
+    edges = np.histogram_bin_edges(values, bins=DENSITY_BINS)
+    centres = (edges[:-1] + edges[1:]) / 2
+    return centres[np.clip(np.searchsorted(edges, values, side="right") - 1, 0, len(centres) - 1)]
+
+
+def _density_figure(points, x_col, y_col):
+    import plotly.graph_objects as go
+
+    # Count on the server so the browser gets one cell per occupied bin
+    # rather than every point
+    cells = pd.DataFrame({"x": _bin_centres(points[x_col]), "y": _bin_centres(points[y_col])}) \
+        .value_counts().reset_index(name="grades")
+    return go.Figure(go.Heatmap(
+        x=cells["x"], y=cells["y"], z=cells["grades"],
+        colorscale="Viridis",
+        colorbar=dict(title="Grades"),
+        hovertemplate=f"{x_col}=%{{x}}<br>{y_col}=%{{y}}<br>grades=%{{z}}<extra></extra>",
+    ))
+
+
+def build_scatter_figure(df, x_col, y_col):
+    """
+    Scatter of y_col against x_col, coloured by polymer type, in the
+    rendering mode scatter_mode picks for the number of plotted points.
+
+    Parameters:
+        df (pd.DataFrame): Catalog ranking table.
+        x_col, y_col (str): Columns on the axes.
+
+    Returns:
+        go.Figure: The figure.
+    """
+    import plotly.express as px
+
+    columns = list(dict.fromkeys([x_col, y_col, "Type of Polymer", *HOVER_DATA]))
+    points = df[columns].dropna(subset=[x_col, y_col])
+    mode = scatter_mode(len(points))
+    title = f"{y_col} vs {x_col}"
+
+    if mode == "density":
+        fig = _density_figure(points, x_col, y_col)
+        fig.update_layout(title=f"{title} ({len(points):,} grades)", template="plotly_dark", height=550,
+                          xaxis_title=x_col, yaxis_title=y_col)
+        sample = _sample_per_type(points, DENSITY_SAMPLE)
+        overlay = px.scatter(sample, x=x_col, y=y_col, color="Type of Polymer", hover_data=HOVER_DATA,
+                             render_mode="webgl")
+        for trace in overlay.data:
+            trace.marker.update(size=4, opacity=0.5)
+            fig.add_trace(trace)
+    else:
+        fig = px.scatter(
+            points,
+            x=x_col,
+            y=y_col,
+            color="Type of Polymer",
+            symbol="Type of Polymer",
+            hover_data=HOVER_DATA,
+            labels={x_col: x_col, y_col: y_col},
+            title=title,
+            template="plotly_dark",
+            height=550,
+            render_mode="webgl" if mode == "webgl" else "svg",
+        )
+        if mode == "svg":
+            fig.update_traces(marker=dict(size=12, opacity=0.85,
+                                          line=dict(width=1, color='black')))
+        else:
+            # Outlines and large markers are what makes big scatters slow to draw
+            fig.update_traces(marker=dict(size=6, opacity=0.7))
+
+    fig.update_layout(
+        title_font_size=18,
+        legend=dict(bgcolor='rgba(0,0,0,0)', borderwidth=0),
+        margin=dict(t=40, b=40, l=0, r=0),
+    )
+    return fig
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def cached_scatter_spec(_df, x_col, y_col, catalog_version):
+    """
+    build_scatter_figure as a plotly spec, built once per (x, y, catalog
+    version) and reused by every session.
+    """
+    return build_scatter_figure(_df, x_col, y_col).to_dict()
+
+
+def render_scatter_explorer(df, catalog_version):
+    """
+    Axis pickers and the scatter plot of the catalog, with PNG export.
+
+    Parameters:
+        df (pd.DataFrame): Catalog ranking table.
+        catalog_version (str): Version of the loaded catalog.
+    """
+    all_columns = df.columns.tolist()
+
+    #skip_columns = ["Score","Polymer Grade_Link","Cost_Link","BBC_Link","Tensile Strength (MPa)_Link","Elongation at break (%)_Link","Tensile Strength-n","Elongation at Break-n"]  # add any column name here
+    skip_columns = []
+    main_columns = [col for col in all_columns if not col.endswith("_Check") and col not in skip_columns]
+
+    x_col = st.selectbox("Select X Axis", main_columns, key="x_axis")
+    y_col = st.selectbox("Select Y Axis", main_columns, key="y_axis")
+
+    if st.button("Generate Scatter Plot"):
+        # plotly is only imported once a plot is asked for; this function runs
+        # on every render of the results page, even with the expander closed
+        import plotly.graph_objects as go
+
+        # The spec was produced by plotly itself, so skip re-validation
+        fig = go.Figure(cached_scatter_spec(df, x_col, y_col, catalog_version), _validate=False)
+
+        st.plotly_chart(fig, use_container_width=True)
+
+        # Optional: Export
+        user = st.session_state.get("user", "anonymous")
+        os.makedirs(os.path.join(FEEDBACK_ROOT, user), exist_ok=True)
+        buf = BytesIO()
+        try:
+            fig.write_image(buf, format="png")
+            buf.seek(0)
+            st.download_button("📥 Download Scatter Plot", buf, file_name=f"scatter_{x_col}_vs_{y_col}.png")
+        except Exception as e:
+            st.warning("Image export failed. Please install `kaleido` using `pip install -U kaleido`.")
+
+        # Logging
+        with open(os.path.join(FEEDBACK_ROOT, user, "analysis_log.txt"), "a") as f:
+            f.write(f"[{datetime.now()}] User {user} generated interactive scatter plot: {y_col} vs {x_col}\n")
@@ -1,5 +1,5 @@
 import streamlit as st
-from app.pages import input_page, output_page
+from app.pages import input_page
 
 st.set_page_config(layout="wide")
 st.markdown("""<style>.css-18ni7ap.e8zbici2 { display: none !important; }</style>""", unsafe_allow_html=True)
@@ -10,4 +10,5 @@ if "page" not in st.session_state:
 if st.session_state.page == "Input":
     input_page.show()
 else:
+    from app.pages import output_page
     output_page.show()
\ No newline at end of file
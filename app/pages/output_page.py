@@ -3,21 +3,23 @@ import pandas as pd
 import os
 from io import BytesIO
 from datetime import datetime
-import matplotlib.pyplot as plt
-import matplotlib as mpl
-import numpy as np
-import re
-from rule_based_insight import show_polymer_blend_insights
-import plotly.express as px  # Put this at the top of your file
-from rule_based_insight import plot_ingredient
-from additional_details import display_polymer_info
-import boto3
-from dotenv import load_dotenv
+import functools
+from catalog import parse_failure_report
+from scoring import filters_key, score_incremental
+from app.components.results_grid import get_ui_state, polymer_ids, render_results_grid
+from app.components.scatter_explorer import render_scatter_explorer
+from app.components.feedback_overview import ADMIN_USERS, render_feedback_overview
+from app.components.memory_report import render_memory_report
+from feedback_log import FEEDBACK_ROOT, log_feedback, make_record
+from feedback_uploader import enqueue_uploads, get_uploader
+from llm_prefetch import PREFETCH_TOP_K, prefetch
+from rule_based_insight import default_insight_requests
+from shared_data import get_shared_catalog, record_session_memory
+from table_export import EXPORT_FORMATS, export_table
 import json
-from io import StringIO
 
-# Plot styling
-mpl.rcParams.update({
+# Plot styling, applied when the first matplotlib chart is drawn
+PLOT_STYLE = {
     'axes.facecolor': '#1a1a1a',
     'axes.edgecolor': '#cccccc',
     'axes.labelcolor': '#ffffff',
@@ -32,12 +34,25 @@ mpl.rcParams.update({
     'legend.frameon': True,
     'legend.facecolor': '#2a2a2a',
     'legend.labelspacing': 0.3
-})
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _pyplot():
+    """
+    matplotlib.pyplot with PLOT_STYLE applied. matplotlib is imported on
+    the first chart rather than with the page, so the page renders sooner.
+    """
+    import matplotlib as mpl
+    import matplotlib.pyplot as plt
 
+    mpl.rcParams.update(PLOT_STYLE)
+    return plt
 
-from openpyxl import load_workbook
 
 def extract_all_links(filepath, sheet_name, column_name):
+    from openpyxl import load_workbook
+
     wb = load_workbook(filepath, data_only=True)
     ws = wb[sheet_name]
 
@@ -71,46 +86,9 @@ def extract_all_links(filepath, sheet_name, column_name):
     return link_map
 
 
-def process_value(val):
-    if pd.isna(val):
-        return np.nan
-    val = str(val).strip().replace(',', '')
-    val = re.sub(r'[*<>≥≤]', '', val)
-    numbers = re.findall(r'\d+\.?\d*', val)
-    if not numbers:
-        return np.nan
-    numbers = [float(n) for n in numbers]
-    return round(sum(numbers) / len(numbers), 2)
-
 def get_data(data_file):
-    df = pd.read_excel(data_file, sheet_name="Clean Data")
-    df_total = df
-    keep_cols = ['Polymer Category', 'Polymer Grade', 'Type of Polymer','Supplier','Cost (USD/Kg)',
-                 'Tensile Strength (MPa)','Elongation at break (%)','Estimated WVTR based on 100 µm thickness (conditions may vary)',
-                 'Estimated WVTR based on 20 µm thickness (conditions may vary)',
-                 'BBC (%)','Compostability','Polymer Grade_Link','Cost_Link','BBC_Link',
-                 'Tensile Strength (MPa)_Link', 'Elongation at break (%)_Link']
-    rename_dict = {
-        'Cost (USD/Kg)': 'Cost',
-        'Tensile Strength (MPa)': 'Tensile Strength',
-        'Elongation at break (%)': 'Elongation at Break',
-        'Estimated WVTR based on 100 µm thickness (conditions may vary)': 'WVTR',
-        'Estimated WVTR based on 20 µm thickness (conditions may vary)':'WVTR-2',
-        'BBC (%)':'BBC'
-    }
-    df = df[keep_cols].rename(columns=rename_dict)
-
-    # Pull hyperlinks from Excel for Polymer Grade column
-    # link_map = extract_all_links(data_file, "Clean Data", "Polymer Grade")
-    # df["Polymer Grade_Link"] = df.index.map(link_map).fillna("")    
-
-    df['Tensile Strength-n'] = df['Tensile Strength'].apply(process_value)
-    df['Elongation at Break-n'] = df['Elongation at Break'].apply(process_value)
-    df['WVTR'] = df['WVTR'].apply(process_value)
-    df['WVTR-2'] = df['WVTR-2'].apply(process_value)
-
-    df['BBC'] = df['BBC'].apply(process_value)
-    return df,df_total
+    catalog = get_shared_catalog(data_file)
+    return catalog.df, catalog.df_total
 
 
 
@@ -118,54 +96,28 @@ def show():
     st.title("📊 Recommended Polymers")
     filters = st.session_state.get("filters", {})
     data_file = "data/Workflow #1 - Data Needs.xlsx"
-    df,df_total = get_data(data_file)
+    catalog = get_shared_catalog(data_file)
+    df, df_total = catalog.df, catalog.df_total
+
+    # Resumes feedback uploads a previous run left in the journal
+    get_uploader()
+    record_session_memory(st.session_state.get("user"))
 
     # st.dataframe(df)
 
-    def check(row):
-        checks = {
-            "Tensile Strength": filters['tensile'][0] <= row["Tensile Strength-n"] <= filters['tensile'][1],
-            "Elongation at Break": filters['elongation'][0] <= row["Elongation at Break-n"] <= filters['elongation'][1],
-            "WVTR": filters['wvtr'][0] <= row["WVTR"] <= filters['wvtr'][1],
-            "WVTR-2": filters['wvtr'][0] <= row["WVTR-2"] <= filters['wvtr'][1],
-            "Cost": filters['cost'][0] <= row["Cost"] <= filters['cost'][1],
-            "BBC": filters['bbc'][0] <= row["BBC"] <= filters['bbc'][1]
-        }
-
-        # ✅ Certs: match against 'Compostability' column
-        user_certs = filters.get('certs', [])
-        compost_str = str(row.get("Compostability", ""))
-        # st.write(user_certs)
-        row_certs = [c.strip() for c in compost_str.split(",") if c.strip()]
-        # st.write(row_certs)
-        checks["Compostability"] = all(cert in row_certs for cert in user_certs)
-
-        # ✅ Geo match
-        if filters['geos']:
-            checks["Continent"] = row.get("Continent", "") in filters["geos"]
-        
-        # st.write(checks)
-        return checks
-
-    results = []
-    for _, row in df.iterrows():
-        checks = check(row)
-        passed = sum(checks.values())
-        row_dict = row.to_dict()
-        row_dict['Score'] = passed
-        row_dict['Feedback'] = ""
-        row_dict['Details'] = ""
-        row_dict['Insights'] = ""
-
-        for key, passed_check in checks.items():
-            row_dict[f"{key}_Check"] = passed_check
-        results.append(row_dict)
-
-    ranked_df = pd.DataFrame(results)
+    ranking_state = st.session_state.setdefault("ranking_state", {})
+    scores = score_incremental(df, filters, catalog.version, ranking_state)
+    ranked_df = df.assign(Score=scores["Score"], Feedback="", Details="", Insights="")
+    ranked_df = ranked_df.join(scores.drop(columns="Score"))
     bio_df = ranked_df[ranked_df["Type of Polymer"] == "Biopolymer"].sort_values(by="Score", ascending=False)
     bench_df = ranked_df[ranked_df["Type of Polymer"] == "Benchmark"].sort_values(by="Score", ascending=False)
     combined_df = pd.concat([bio_df, bench_df]).reset_index(drop=True)
 
+    # Opt-in: warm the LLM cache with the insights users usually open first
+    if PREFETCH_TOP_K:
+        top_polymers = bio_df["Polymer Category"].dropna().drop_duplicates().head(PREFETCH_TOP_K)
+        prefetch(default_insight_requests(top_polymers.tolist()))
+
     all_columns = combined_df.columns.tolist()
 
     skip_columns = ["Score","Polymer Grade_Link","Cost_Link","BBC_Link","Tensile Strength (MPa)_Link","Elongation at break (%)_Link","Tensile Strength-n","Elongation at Break-n"]  # add any column name here
@@ -192,342 +144,19 @@ def show():
 
 
 
-    header_cols = st.columns(len(main_columns))
-    for i, col_name in enumerate(main_columns):
-        label = column_labels.get(col_name, col_name)
-        header_cols[i].markdown(
-            f"""
-            <div style="
-                display: flex;
-                flex-direction: column;
-                justify-content: space-between;
-                align-items: center;
-                height: 70px;
-                color: #eee;
-                font-weight: 600;
-                font-size: 0.95rem;
-                text-align: center;
-                padding: 0 4px;
-            ">
-                <div style="line-height: 1.2em;">{label}</div>
-                <div style="width: 100%; border-top: 4px solid #8942E5; margin-top: 0.5rem;"></div>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
-
-    # for i, col_name in enumerate(main_columns):
-    #     label = column_labels.get(col_name, col_name)
-    #     header_cols[i].markdown(
-    #         f"""
-    #         <div style='text-align:center; color:#eee; font-weight:600; font-size:0.95rem; padding-bottom:0.2rem;'>
-    #             {label}
-    #             <hr style='border: 2px solid #8942E5; margin: 0.4rem 0 0 0;' />
-    #         </div>
-    #         """,
-    #         unsafe_allow_html=True
-    #     )
-
-    for idx, row in combined_df.iterrows():
-        toggle_key = f"show_details_{idx}"
-        insight_key = f"show_insights_{idx}"
-
-        feedback_key = f"feedback_{idx}"
-        button_key = f"button_{idx}"
-        if toggle_key not in st.session_state:
-            st.session_state[toggle_key] = False
-        if insight_key not in st.session_state:
-            st.session_state[insight_key] = False
-
-        with st.container():
-            st.markdown("<div style='margin-bottom: 16px;'>", unsafe_allow_html=True)
-            display_cols = st.columns(len(main_columns))
-            for i, col_name in enumerate(main_columns):
-                bg_color = "#111" if col_name in ["Polymer Category", "Polymer Grade", "Score", "Type of Polymer","Supplier"] else (
-                    "#1f3b1f" if row.get(f"{col_name}_Check") else "#3b1f1f"
-                )
-                text_color = "#eee"
-
-                if col_name == "Feedback":
-
-                    #popover for feedback
-                    with display_cols[i].popover("Feedback"):
-                        st.text_input("Feedback", key=feedback_key, label_visibility="collapsed", placeholder="Write here...")
-                        if st.button("Submit Feedback", key=button_key+"submit"):
-                            # save feedback to a text file and upload to s3 use .env for credentials if file does not exist create it if it does append to it
-                            user = st.session_state.get("user", "anonymous")
-                            ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-                            save_dir = f"Data/feedback/{user}/for_Polymers"
-                            os.makedirs(save_dir, exist_ok=True)
-                            file_txt = os.path.join(save_dir, f"feedback_for_{row['Polymer Category']}_{row['Polymer Grade']}_{idx}_{ts}.txt")
-
-                            #upload to s3 if file exists read the file and add the new feedback to the end of the file
-                            if os.path.exists(file_txt):
-                                with open(file_txt, "r") as f:
-                                    feedback = f.read()
-                                feedback += f"\n{st.session_state[feedback_key]}"
-                            else:
-                                #create the file
-                                with open(file_txt, "w") as f:
-                                    f.write(st.session_state[feedback_key])
-                                feedback = st.session_state[feedback_key]
-
-                            #upload file_txt to s3
-                            s3_client = boto3.client(
-                                's3',
-                                region_name=os.getenv('AWS_REGION'),
-                                aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-                                aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
-                            )
-                            #upload to s3 in the user folder in the folder feedback_for_Polymers
-                            bucket_name = "feedbackworkflow1"
-                            object_key = f"{user}/feedback_for_Polymers/{row['Polymer Category']}_{row['Polymer Grade']}_{idx}_{ts}.txt"
-                            s3_client.upload_file(
-                                file_txt, 
-                                bucket_name, 
-                                object_key
-                            )
-
-                            #success message
-                            st.success("Feedback submitted")
-
-                        
-                elif col_name == "Details":
-                    if display_cols[i].button("Details", key=button_key):
-                        st.session_state[toggle_key] = not st.session_state[toggle_key]
-                elif col_name == "Insights":
-                    if display_cols[i].button("Insights", key=f"insights_{idx}"):
-                        st.session_state[insight_key] = not st.session_state[insight_key]
-
-                elif col_name == "Polymer Grade":
-                    grade = row[col_name]
-                    link = row.get("Polymer Grade_Link", "")
-                    if pd.notna(link) and isinstance(link, str) and link.startswith("http"):
-                        display_cols[i].markdown(
-                            f"""
-                            <a href="{link}" target="_blank" style="
-                                display: inline-block;
-                                text-decoration: none;
-                                background-color: {bg_color};
-                                color: {text_color};
-                                font-weight: bold;
-                                padding: 6px 10px;
-                                border-radius: 6px;
-                                text-align: center;
-                            ">{grade}</a>
-                            """,
-                            unsafe_allow_html=True
-                        )
-                    else:
-                        display_cols[i].markdown(
-                            f"""
-                            <a href= "https://www.planeterthos.com/404" target="_blank" style="
-                                display: inline-block;
-                                text-decoration: none;
-                                background-color: {bg_color};
-                                color: {text_color};
-                                font-weight: bold;
-                                padding: 6px 10px;
-                                border-radius: 6px;
-                                text-align: center;
-                            ">{grade}</a>
-                            """,
-                            unsafe_allow_html=True
-                        )
-                    # else:
-                    #     display_cols[i].markdown(
-                    #         f"<div style='border:1px solid #555; padding:10px; background-color:{bg_color}; color:{text_color}'>{grade}</div>",
-                    #         unsafe_allow_html=True
-                    #     )
-                elif col_name == "Cost":
-                    grade = row[col_name]
-                    link = row.get("Cost_Link", "")
-                    if pd.notna(link) and isinstance(link, str) and link.startswith("http"):
-                        display_cols[i].markdown(
-                            f"""
-                            <a href="{link}" target="_blank" style="
-                                display: inline-block;
-                                text-decoration: none;
-                                background-color: {bg_color};
-                                color: {text_color};
-                                font-weight: bold;
-                                padding: 6px 10px;
-                                border-radius: 6px;
-                                text-align: center;
-                            ">{grade}</a>
-                            """,
-                            unsafe_allow_html=True
-                        )
-                    else:
-                        
-                        display_cols[i].markdown(
-                            f"""
-                            <a href= "https://www.planeterthos.com/404" target="_blank" style="
-                                display: inline-block;
-                                text-decoration: none;
-                                background-color: {bg_color};
-                                color: {text_color};
-                                font-weight: bold;
-                                padding: 6px 10px;
-                                border-radius: 6px;
-                                text-align: center;
-                            ">{grade}</a>
-                            """,
-                            unsafe_allow_html=True
-                        )
-                        # display_cols[i].markdown(
-                        #     f"<div style='border:1px solid #555; padding:10px; background-color:{bg_color}; color:{text_color}'>{grade}</div>",
-                        #     unsafe_allow_html=True
-                        # )
-                elif col_name == "BBC":
-                    grade = row[col_name]
-                    link = row.get("BBC_Link", "")
-                    if pd.notna(link) and isinstance(link, str) and link.startswith("http"):
-                        display_cols[i].markdown(
-                            f"""
-                            <a href="{link}" target="_blank" style="
-                                display: inline-block;
-                                text-decoration: none;
-                                background-color: {bg_color};
-                                color: {text_color};
-                                font-weight: bold;
-                                padding: 6px 10px;
-                                border-radius: 6px;
-                                text-align: center;
-                            ">{grade}</a>
-                            """,
-                            unsafe_allow_html=True
-                        )
-                    else:
-                        display_cols[i].markdown(
-                            f"""
-                            <a href= "https://www.planeterthos.com/404" target="_blank" style="
-                                display: inline-block;
-                                text-decoration: none;
-                                background-color: {bg_color};
-                                color: {text_color};
-                                font-weight: bold;
-                                padding: 6px 10px;
-                                border-radius: 6px;
-                                text-align: center;
-                            ">{grade}</a>
-                            """,
-                            unsafe_allow_html=True
-                        )
-                        # display_cols[i].markdown(
-                        #     f"<div style='border:1px solid #555; padding:10px; background-color:{bg_color}; color:{text_color}'>{grade}</div>",
-                        #     unsafe_allow_html=True
-                        # )
-                elif col_name == "Tensile Strength":
-                    grade = row[col_name]
-                    link = row.get("Tensile Strength (MPa)_Link", "")
-                    if pd.notna(link) and isinstance(link, str) and link.startswith("http"):
-                        display_cols[i].markdown(
-                            f"""
-                            <a href="{link}" target="_blank" style="
-                                display: inline-block;
-                                text-decoration: none;
-                                background-color: {bg_color};
-                                color: {text_color};
-                                font-weight: bold;
-                                padding: 6px 10px;
-                                border-radius: 6px;
-                                text-align: center;
-                            ">{grade}</a>
-                            """,
-                            unsafe_allow_html=True
-                        )
-                    else:
-                        display_cols[i].markdown(
-                            f"""
-                            <a href= "https://www.planeterthos.com/404" target="_blank" style="
-                                display: inline-block;
-                                text-decoration: none;
-                                background-color: {bg_color};
-                                color: {text_color};
-                                font-weight: bold;
-                                padding: 6px 10px;
-                                border-radius: 6px;
-                                text-align: center;
-                            ">{grade}</a>
-                            """,
-                            unsafe_allow_html=True
-                        )
-                        # display_cols[i].markdown(
-                        #     f"<div style='border:1px solid #555; padding:10px; background-color:{bg_color}; color:{text_color}'>{grade}</div>",
-                        #     unsafe_allow_html=True
-                        # )
-
-                elif col_name == "Elongation at Break":
-                    grade = row[col_name]
-                    link = row.get("Elongation at break (%)_Link", "")
-                    if pd.notna(link) and isinstance(link, str) and link.startswith("http"):
-                        display_cols[i].markdown(
-                            f"""
-                            <a href="{link}" target="_blank" style="
-                                display: inline-block;
-                                text-decoration: none;
-                                background-color: {bg_color};
-                                color: {text_color};
-                                font-weight: bold;
-                                padding: 6px 10px;
-                                border-radius: 6px;
-                                text-align: center;
-                            ">{grade}</a>
-                            """,
-                            unsafe_allow_html=True
-                        )
-                    else:
-                        display_cols[i].markdown(
-                            f"""
-                            <a href= "https://www.planeterthos.com/404" target="_blank" style="
-                                display: inline-block;
-                                text-decoration: none;
-                                background-color: {bg_color};
-                                color: {text_color};
-                                font-weight: bold;
-                                padding: 6px 10px;
-                                border-radius: 6px;
-                                text-align: center;
-                            ">{grade}</a>
-                            """,
-                            unsafe_allow_html=True
-                        )
-                        # display_cols[i].markdown(
-                        #     f"<div style='border:1px solid #555; padding:10px; background-color:{bg_color}; color:{text_color}'>{grade}</div>",
-                        #     unsafe_allow_html=True
-                        # )
-                else:
-                    display_cols[i].markdown(
-                        f"<div style='border:1px solid #555; padding:10px; background-color:{bg_color}; color:{text_color}'>{row[col_name]}</div>",
-                        unsafe_allow_html=True
-                    )
-            st.markdown("</div>", unsafe_allow_html=True)
-
-        if st.session_state[toggle_key]:
-            
-            st.markdown(f"### Compostability data for {row['Polymer Category']}:", unsafe_allow_html=True)
-
-            plot_ingredient("./data/Bio_Dis_Data.xlsx",row["Polymer Category"])
-
-            display_polymer_info(df_total, row["Polymer Category"], row["Polymer Grade"])
-
-            # st.markdown("### Additional details:", unsafe_allow_html=True)
-            # st.markdown(html_table, unsafe_allow_html=True)  # ✅ Important!
-
-
+    render_results_grid(combined_df, main_columns, column_labels, df_total, len(bio_df),
+                        catalog.version, filters_key(filters))
 
-        if st.session_state[insight_key]:
-            st.markdown(f"### Insights for {row['Polymer Category']}")
-
-            key = row["Polymer Category"] + row["Polymer Grade"]
-
-            show_polymer_blend_insights(row["Polymer Category"],key)
-
-            
+    parse_failures = parse_failure_report(catalog)
+    if not parse_failures.empty:
+        with st.expander(f"⚠️ {len(parse_failures)} values could not be parsed and are excluded from scoring"):
+            st.dataframe(parse_failures, hide_index=True)
 
-        if idx + 1 == len(bio_df):
-            st.markdown("<hr style='border: 1px dashed #444;'>", unsafe_allow_html=True)
+    if st.session_state.get("user") in ADMIN_USERS:
+        with st.expander("📋 Feedback overview"):
+            render_feedback_overview()
+        with st.expander("🧮 Memory"):
+            render_memory_report()
 
     user = st.session_state.get("user", "anonymous")
 
@@ -577,76 +206,74 @@ def show():
             st.markdown("---")
             extra_feedback = st.text_area("4️⃣ Any other feedback for erthos? (optional)", key="extra_feedback")
 
+            export_format = st.radio("Results file format", list(EXPORT_FORMATS),
+                                     format_func=lambda fmt: EXPORT_FORMATS[fmt][0],
+                                     horizontal=True, key="export_format")
+
             if st.button("✅ Submit Feedback"):
                 user = st.session_state.get("user", "anonymous")
                 ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-                save_dir = f"Data/Feedback/{user}"
+                save_dir = os.path.join(FEEDBACK_ROOT, user)
                 os.makedirs(save_dir, exist_ok=True)
 
-                # Save the general feedback survey
-                file_txt = os.path.join(save_dir, f"feedback_survey_{ts}.txt")
-                with open(file_txt, "w") as f:
-                    f.write(f"Recommendation Likelihood: {st.session_state.get('recommend_score', 0)}/5\n")
-                    f.write(f"Improvement Suggestions: {improvement.strip()}\n")
-                    f.write(f"DOE Relevance Score: {st.session_state.get('doe_rating', 0)}/5\n")
-                    f.write(f"DOE Comments: {doe_notes.strip()}\n")
-                    f.write(f"Other Feedback: {extra_feedback.strip()}\n")
-                    
-                    # Add a section for polymer-specific feedback
-                    f.write("\n--- Polymer-Specific Feedback ---\n")
-                    polymer_feedbacks = []
-                    for idx, row in combined_df.iterrows():
-                        feedback_key = f"feedback_{idx}"
-                        feedback_text = st.session_state.get(feedback_key, "")
-                        if feedback_text:  # Only write non-empty feedback
-                            polymer_category = row['Polymer Category']
-                            polymer_grade = row['Polymer Grade']
-                            f.write(f"{polymer_category} - {polymer_grade}: {feedback_text}\n")
-                            polymer_feedbacks.append({
-                                "polymer_category": polymer_category,
-                                "polymer_grade": polymer_grade,
-                                "feedback": feedback_text
-                            })
+                # Build the general feedback survey text
+                survey_lines = [
+                    f"Recommendation Likelihood: {st.session_state.get('recommend_score', 0)}/5\n",
+                    f"Improvement Suggestions: {improvement.strip()}\n",
+                    f"DOE Relevance Score: {st.session_state.get('doe_rating', 0)}/5\n",
+                    f"DOE Comments: {doe_notes.strip()}\n",
+                    f"Other Feedback: {extra_feedback.strip()}\n",
+                ]
+
+                # Add a section for polymer-specific feedback
+                survey_lines.append("\n--- Polymer-Specific Feedback ---\n")
+                polymer_feedbacks = []
+                drafts = get_ui_state()["drafts"]
+                feedback_texts = polymer_ids(combined_df).map(lambda pid: drafts.get(pid, ""))
+                for idx, row in combined_df.iterrows():
+                    feedback_text = feedback_texts.at[idx]
+                    if feedback_text:  # Only write non-empty feedback
+                        polymer_category = row['Polymer Category']
+                        polymer_grade = row['Polymer Grade']
+                        survey_lines.append(f"{polymer_category} - {polymer_grade}: {feedback_text}\n")
+                        polymer_feedbacks.append({
+                            "polymer_category": polymer_category,
+                            "polymer_grade": polymer_grade,
+                            "feedback": feedback_text
+                        })
+
+                # Append the survey and its polymer notes to the local feedback log
+                submission_id = f"{user}-{ts}"
+                log_feedback([make_record(
+                    user, "survey", submission_id,
+                    recommendation_score=st.session_state.get('recommend_score', 0),
+                    improvement_suggestions=improvement.strip(),
+                    doe_relevance_score=st.session_state.get('doe_rating', 0),
+                    doe_comments=doe_notes.strip(),
+                    other_feedback=extra_feedback.strip(),
+                )] + [
+                    make_record(user, "survey_polymer", submission_id,
+                                polymer_category=item["polymer_category"],
+                                polymer_grade=item["polymer_grade"],
+                                text=item["feedback"])
+                    for item in polymer_feedbacks
+                ])
 
                 # Update the DataFrame with the feedback before saving to Excel
-                for idx, row in combined_df.iterrows():
-                    feedback_key = f"feedback_{idx}"
-                    combined_df.at[idx, "Feedback"] = st.session_state.get(feedback_key, "")
+                combined_df["Feedback"] = feedback_texts
                 
-                # Save Excel with the feedback included
-                results_file = os.path.join(save_dir, f"results_{ts}.xlsx")
-                combined_df[main_columns].to_excel(results_file, index=False)
-
-                # Save to S3 bucket
+                # Serialize the results with the feedback included once, in memory;
+                # the bytes are written once to the local copy, which the uploader
+                # streams from, and handed straight to the download button
+                results_name = f"results_{ts}.{export_format}"
+                results_file = os.path.join(save_dir, results_name)
+                results_bytes = export_table(combined_df[main_columns], export_format)
+                with open(results_file, "wb") as f:
+                    f.write(results_bytes)
+
+                # Queue the uploads to the S3 bucket; the background uploader retries until they land
                 try:
-                    # Initialize S3 client
-                    s3_client = boto3.client(
-                        's3',
-                        region_name=os.getenv('AWS_REGION'),
-                        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-                        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
-                    )
-                    
-                    # Define S3 bucket name and object keys
-                    bucket_name = "feedbackworkflow1"
-                    
-                    # Upload Excel file to S3
-                    excel_object_key = f"{user}/results_{ts}.xlsx"
-                    s3_client.upload_file(
-                        results_file, 
-                        bucket_name, 
-                        excel_object_key
-                    )
-                    
-                    # Upload text feedback to S3
-                    txt_object_key = f"{user}/feedback_survey_{ts}.txt"
-                    s3_client.upload_file(
-                        file_txt,
-                        bucket_name,
-                        txt_object_key
-                    )
-                    
-                    # Upload JSON structured feedback for easier analysis
+                    # Structured JSON feedback for easier analysis
                     feedback_data = {
                         "user": user,
                         "timestamp": ts,
@@ -659,16 +286,14 @@ def show():
                         },
                         "polymer_feedback": polymer_feedbacks
                     }
-                    
-                    json_object_key = f"{user}/feedback_{ts}.json"
-                    json_data = StringIO(json.dumps(feedback_data, indent=2))
-                    s3_client.put_object(
-                        Bucket=bucket_name,
-                        Key=json_object_key,
-                        Body=json_data.getvalue()
-                    )
-                    
-                    st.success("🎉 Thank you for your feedback! Data saved locally and to cloud storage.")
+
+                    enqueue_uploads([
+                        {"file": results_file, "key": f"{user}/{results_name}"},
+                        {"body": "".join(survey_lines), "key": f"{user}/feedback_survey_{ts}.txt"},
+                        {"body": json.dumps(feedback_data, indent=2), "key": f"{user}/feedback_{ts}.json"},
+                    ])
+
+                    st.success("🎉 Thank you for your feedback! Data saved locally and queued for cloud storage.")
                     
                 except Exception as e:
                     st.warning(f"Local feedback saved, but cloud upload encountered an issue: {str(e)}")
@@ -677,13 +302,12 @@ def show():
                 st.info("Your input helps us grow and improve, so we can keep building tools that truly support you and your work.")
 
                 # Offer download right after submission
-                with open(results_file, "rb") as f:
-                    st.download_button(
-                        "📥 Download Your Results",
-                        f.read(),
-                        file_name=os.path.basename(results_file),
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
+                st.download_button(
+                    "📥 Download Your Results",
+                    results_bytes,
+                    file_name=results_name,
+                    mime=EXPORT_FORMATS[export_format][1]
+                )
     # if st.button("💾 Save Table & Rate Results"):
     # with st.popover("💾 Save Table &  💬  Rate Results"):
     #         st.markdown("**Thank you for using erthos' new tool!** Before you leave, please take a few minutes to share your thoughts.")
@@ -743,55 +367,7 @@ def show():
 
 
     with st.expander("1️⃣ Scatter Plot Explorer"):
-        
-        all_columns = df.columns.tolist()
-
-
-        #skip_columns = ["Score","Polymer Grade_Link","Cost_Link","BBC_Link","Tensile Strength (MPa)_Link","Elongation at break (%)_Link","Tensile Strength-n","Elongation at Break-n"]  # add any column name here
-        skip_columns = []
-        main_columns = [col for col in all_columns if not col.endswith("_Check") and col not in skip_columns]
-        
-        x_col = st.selectbox("Select X Axis", main_columns, key="x_axis")
-        y_col = st.selectbox("Select Y Axis", main_columns, key="y_axis")
-
-        if st.button("Generate Scatter Plot"):
-            fig = px.scatter(
-                df,
-                x=x_col,
-                y=y_col,
-                color="Type of Polymer",
-                symbol="Type of Polymer",
-                hover_data={"Polymer Category": True, "Polymer Grade": True},
-                labels={x_col: x_col, y_col: y_col},
-                title=f"{y_col} vs {x_col}",
-                template="plotly_dark",
-                height=550
-            )
-
-            fig.update_traces(marker=dict(size=12, opacity=0.85,
-                                        line=dict(width=1, color='black')))
-            fig.update_layout(
-                title_font_size=18,
-                legend=dict(bgcolor='rgba(0,0,0,0)', borderwidth=0),
-                margin=dict(t=40, b=40, l=0, r=0),
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
-
-            # Optional: Export
-            user = st.session_state.get("user", "anonymous")
-            os.makedirs(f"Data/Feedback/{user}", exist_ok=True)
-            buf = BytesIO()
-            try:
-                fig.write_image(buf, format="png")
-                buf.seek(0)
-                st.download_button("📥 Download Scatter Plot", buf, file_name=f"scatter_{x_col}_vs_{y_col}.png")
-            except Exception as e:
-                st.warning("Image export failed. Please install `kaleido` using `pip install -U kaleido`.")
-
-            # Logging
-            with open(f"Data/Feedback/{user}/analysis_log.txt", "a") as f:
-                f.write(f"[{datetime.now()}] User {user} generated interactive scatter plot: {y_col} vs {x_col}\n")
+        render_scatter_explorer(df, catalog.version)
 
 
 
@@ -844,7 +420,7 @@ def show():
                 val_benchmark = df[(df["Polymer Category"] == benchmark_cat) & (df["Polymer Grade"] == benchmark_grade)][props].iloc[0]
 
                 # Create bar chart
-                fig, ax = plt.subplots(figsize=(8, 5))
+                fig, ax = _pyplot().subplots(figsize=(8, 5))
                 x = range(len(props))
                 ax.bar([i - 0.2 for i in x], val_target, width=0.4, label=target_label, color='#66c2a5')
                 ax.bar([i + 0.2 for i in x], val_benchmark, width=0.4, label=benchmark_label, color='#fc8d62')
@@ -857,13 +433,13 @@ def show():
                 st.pyplot(fig)
 
                 # Save image and log
-                os.makedirs(f"Data/Feedback/{user}", exist_ok=True)
+                os.makedirs(os.path.join(FEEDBACK_ROOT, user), exist_ok=True)
                 buf = BytesIO()
                 fig.savefig(buf, format="png", bbox_inches='tight')
                 buf.seek(0)
                 st.download_button("📥 Download Bar Chart", buf, file_name=f"benchmark_{target_cat}_{target_grade}_vs_{benchmark_cat}_{benchmark_grade}.png")
 
-                with open(f"Data/Feedback/{user}/analysis_log.txt", "a") as f:
+                with open(os.path.join(FEEDBACK_ROOT, user, "analysis_log.txt"), "a") as f:
                     f.write(f"[{datetime.now()}] User {user} compared {target_label} vs {benchmark_label} on {props}\n")
 
             except Exception as e:
@@ -1,12 +1,13 @@
 import streamlit as st
 import pandas as pd
-from llm_handler import call_llm 
+from llm_handler import call_llm_many
+from shared_data import share
 
-# Load data
-@st.cache_data
+# Load data once per process, shared read-only by all sessions
+@st.cache_resource
 def load_data():
     file = "./Data_Rule_Based/Extended_Unified_Polymer_Model.xlsx"
-    return pd.read_excel(file)
+    return share("blend model", pd.read_excel(file))
 
 data = load_data()
 
@@ -30,6 +31,8 @@ if st.button("Get Recommendations"):
         st.warning("No matches found for this polymer and category.")
     else:
         st.subheader("Recommended Blends")
+        insight_slots = []
+        requests = []
         for _, row in df.iterrows():
             st.markdown(f"### Blend: {row['Polymer A']} + {row['Polymer B']}")
             st.write(f"**Mechanism:** {row['Mechanism']}")
@@ -37,11 +40,21 @@ if st.button("Get Recommendations"):
             st.write(f"**Compatibility:** {row['Compatibility Type']}")
             st.write(f"**Recommended wt%:** {row['Recommended wt%']}, Max Processing: {row['Max Processing']}, Max Compostability: {row['Max Compostability']}")
             st.write(f"**Reference:** {row['Reference']}")
-            
+
             # Optional: Ask LLM to extract insights from the reference
-            explanation = call_llm(
-                user_input=f"Explain why {row['Polymer B']} is a good match for {row['Polymer A']} in the context of {row['Category']}.",
-                prompt=f"Use this reference: {row['Reference']} and summarize the mechanism.",
-                llm_model_name="gpt-4"
-            )
-            st.markdown(f"**LLM Insight:** {explanation}")
+            insight_slots.append(st.empty())
+            insight_slots[-1].markdown("**LLM Insight:** _generating..._")
+            requests.append((
+                f"Explain why {row['Polymer B']} is a good match for {row['Polymer A']} in the context of {row['Category']}.",
+                f"Use this reference: {row['Reference']} and summarize the mechanism.",
+                "gpt-4",
+            ))
+
+        # All blends are queried at once; each insight appears as soon as it is ready
+        def show_insight(index, result):
+            if result.error is not None:
+                insight_slots[index].markdown(f"**LLM Insight:** Error retrieving LLM response: {result.error}")
+            else:
+                insight_slots[index].markdown(f"**LLM Insight:** {result.text}")
+
+        call_llm_many(requests, on_result=show_insight)
@@ -0,0 +1,81 @@
+"""
+Cold-start import cost of each page of the app, measured in fresh
+interpreters with `python -X importtime`, so regressions in time to first
+paint show up before they reach a container.
+
+Example usage (from the repository root):
+    python -m benchmarks.import_benchmark --runs 5 --top 10
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What each screen imports before it can render, mirroring app.py
+SCENARIOS = {
+    "login/input page": ["streamlit", "auth.login", "app.pages.input_page"],
+    "output page": ["streamlit", "auth.login", "app.pages.input_page", "app.pages.output_page"],
+    "llm call path": ["llm_handler"],
+}
+# Packages that should only load once a page or feature actually needs them
+HEAVY_MODULES = ["matplotlib", "plotly", "openpyxl", "boto3", "botocore", "openai", "dotenv"]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def run_once(modules):
+    """
+    Imports modules in a fresh interpreter.
+
+    Returns:
+        tuple: (total self time in ms, {package: cumulative ms} for
+        non-stdlib top-level packages, heavy modules that got loaded).
+    """
+    code = (
+        "import sys\n"
+        + "".join(f"import {module}\n" for module in modules)
+        + f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+    total_us, cumulative = 0, {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        total_us += int(self_us)
+        # Third-party and project packages, wherever they were first imported
+        if "." not in name and name not in sys.stdlib_module_names:
+            cumulative[name] = max(cumulative.get(name, 0), int(cumulative_us) / 1000)
+    loaded = [name for name in proc.stdout.strip().split(",") if name]
+    return total_us / 1000, cumulative, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per scenario")
+    parser.add_argument("--top", type=int, default=8, help="heaviest top-level packages to list")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    args = parser.parse_args()
+
+    for name in [name.strip() for name in args.scenarios.split(",") if name.strip()]:
+        runs = [run_once(SCENARIOS[name]) for _ in range(args.runs)]
+        totals = [total for total, _, _ in runs]
+        # Per-module times from the median run, so the table adds up
+        _, cumulative, loaded = sorted(runs, key=lambda run: run[0])[len(runs) // 2]
+
+        print(f"{name}: median {statistics.median(totals):.0f} ms "
+              f"(min {min(totals):.0f}, max {max(totals):.0f}) over {args.runs} runs")
+        print(f"  heavy modules loaded: {', '.join(loaded) or 'none'}")
+        for module, ms in sorted(cumulative.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {ms:>9.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
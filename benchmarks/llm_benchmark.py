@@ -0,0 +1,141 @@
+"""
+Latency and throughput of the llm_handler call paths against the local
+fake provider (fake_llm.py), so LLM-path changes can be compared offline.
+
+Example usage (from the repository root):
+    python -m benchmarks.llm_benchmark --requests 200 --latency-ms 400 --seed 7
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def summarize(path, latencies, wall, errors):
+    """
+    One result row: p50/p95/p99 latency in ms and throughput in requests/s.
+    """
+    latencies = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (np.nan,) * 3
+    return {"path": path, "requests": len(latencies) + errors, "errors": errors,
+            "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+            "throughput_rps": (len(latencies) + errors) / wall if wall else np.nan}
+
+
+def requests_for(model, count, tag):
+    return [(f"How does additive {i} improve PLA? ({tag})", "Explain the blending mechanism.", model)
+            for i in range(count)]
+
+
+def bench_single(llm_handler, model, count):
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for request in requests_for(model, count, "single"):
+        t = time.perf_counter()
+        try:
+            llm_handler.call_llm(*request, use_cache=False, raise_errors=True)
+            latencies.append(time.perf_counter() - t)
+        except llm_handler.LLMError:
+            errors += 1
+    return summarize("single", latencies, time.perf_counter() - started, errors)
+
+
+def bench_batch(llm_handler, model, count, concurrency):
+    latencies = []
+    started = time.perf_counter()
+
+    # Latency of a batch item is how long the caller waited for it
+    def record(index, result):
+        if result.error is None:
+            latencies.append(time.perf_counter() - started)
+
+    results = llm_handler.call_llm_many(requests_for(model, count, "batch"), max_concurrency=concurrency,
+                                        on_result=record, use_cache=False)
+    errors = sum(result.error is not None for result in results)
+    return summarize(f"batch (x{concurrency})", latencies, time.perf_counter() - started, errors)
+
+
+def bench_cached(llm_handler, model, count):
+    requests = requests_for(model, count, "cached")
+    llm_handler.call_llm_many(requests)      # warm the cache
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for request in requests:
+        t = time.perf_counter()
+        try:
+            llm_handler.call_llm(*request, raise_errors=True)
+            latencies.append(time.perf_counter() - t)
+        except llm_handler.LLMError:
+            errors += 1
+    return summarize("cached", latencies, time.perf_counter() - started, errors)
+
+
+def bench_stream_first_chunk(llm_handler, model, count):
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for request in requests_for(model, count, "stream"):
+        t = time.perf_counter()
+        try:
+            stream = llm_handler.stream_llm(*request, use_cache=False, raise_errors=True)
+            next(stream)
+            latencies.append(time.perf_counter() - t)
+            for _ in stream:
+                pass
+        except llm_handler.LLMError:
+            errors += 1
+    return summarize("stream (first chunk)", latencies, time.perf_counter() - started, errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default="gpt-4",
+                        help="model name; picks the OpenAI, Claude or Titan payload shape")
+    parser.add_argument("--requests", type=int, default=100, help="requests per path")
+    parser.add_argument("--concurrency", type=int, default=8, help="call_llm_many concurrency")
+    parser.add_argument("--latency-ms", type=float, default=200, help="median response latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="log-normal latency spread")
+    parser.add_argument("--first-token-ms", type=float, default=80, help="median time to first chunk")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 5xx failures")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of throttled requests")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--paths", default="single,batch,cached,stream",
+                        help="comma-separated subset of single,batch,cached,stream")
+    args = parser.parse_args()
+
+    # Keep benchmark answers out of the app's response cache
+    cache_dir = tempfile.mkdtemp(prefix="llm-bench-")
+    os.environ["LLM_CACHE_PATH"] = os.path.join(cache_dir, "responses.sqlite3")
+    os.environ.pop("LLM_CACHE_DISABLED", None)
+
+    import fake_llm
+    import llm_handler
+
+    provider = fake_llm.install(fake_llm.FakeProvider(fake_llm.FakeProviderConfig(
+        latency_ms=args.latency_ms, latency_sigma=args.latency_sigma, first_token_ms=args.first_token_ms,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate, seed=args.seed,
+    )))
+
+    paths = {
+        "single": lambda: bench_single(llm_handler, args.model, args.requests),
+        "batch": lambda: bench_batch(llm_handler, args.model, args.requests, args.concurrency),
+        "cached": lambda: bench_cached(llm_handler, args.model, args.requests),
+        "stream": lambda: bench_stream_first_chunk(llm_handler, args.model, args.requests),
+    }
+    rows = [paths[name.strip()]() for name in args.paths.split(",") if name.strip()]
+
+    print(f"model={args.model} requests/path={args.requests} median latency={args.latency_ms:g}ms "
+          f"errors={args.error_rate:g} throttles={args.throttle_rate:g} seed={args.seed}")
+    print(f"{'path':<22}{'requests':>9}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for row in rows:
+        print(f"{row['path']:<22}{row['requests']:>9}{row['errors']:>8}{row['p50_ms']:>10.1f}"
+              f"{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['throughput_rps']:>10.1f}")
+    print(f"provider calls: {provider.calls}")
+
+
+if __name__ == "__main__":
+    main()
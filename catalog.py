@@ -0,0 +1,280 @@
+import hashlib
+import json
+import os
+import re
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+CATALOG_SHEET = "Clean Data"
+SNAPSHOT_DIR_NAME = ".catalog"
+SNAPSHOT_FORMAT = 2
+
+# Columns used by the ranking table, and their display names
+KEEP_COLS = ['Polymer Category', 'Polymer Grade', 'Type of Polymer','Supplier','Cost (USD/Kg)',
+             'Tensile Strength (MPa)','Elongation at break (%)','Estimated WVTR based on 100 µm thickness (conditions may vary)',
+             'Estimated WVTR based on 20 µm thickness (conditions may vary)',
+             'BBC (%)','Compostability','Polymer Grade_Link','Cost_Link','BBC_Link',
+             'Tensile Strength (MPa)_Link', 'Elongation at break (%)_Link']
+RENAME_DICT = {
+    'Cost (USD/Kg)': 'Cost',
+    'Tensile Strength (MPa)': 'Tensile Strength',
+    'Elongation at break (%)': 'Elongation at Break',
+    'Estimated WVTR based on 100 µm thickness (conditions may vary)': 'WVTR',
+    'Estimated WVTR based on 20 µm thickness (conditions may vary)':'WVTR-2',
+    'BBC (%)':'BBC'
+}
+
+# Raw text -> parsed value, shared across loads; catalogs repeat values
+# such as "≥90" or "20-30" across many grades
+_PARSE_MEMO = {}
+_PARSE_MEMO_LIMIT = 100_000
+
+
+class Catalog(NamedTuple):
+    df: pd.DataFrame        # ranking columns, numeric fields already parsed
+    df_total: pd.DataFrame  # full "Clean Data" sheet for the Details panel
+    version: str            # content hash of the source workbook
+    parse_failures: pd.DataFrame  # per parsed column, cells that had no number
+
+
+def process_value(val):
+    if pd.isna(val):
+        return np.nan
+    val = str(val).strip().replace(',', '')
+    val = re.sub(r'[*<>≥≤]', '', val)
+    numbers = re.findall(r'\d+\.?\d*', val)
+    if not numbers:
+        return np.nan
+    numbers = [float(n) for n in numbers]
+    return round(sum(numbers) / len(numbers), 2)
+
+
+def _parse_unique(raw_values):
+    # Same steps as process_value, run as vectorized string ops over the
+    # distinct raw strings; only the final averaging is per value so the
+    # rounding matches process_value exactly.
+    cleaned = (
+        pd.Series(raw_values, dtype=object)
+        .str.strip()
+        .str.replace(',', '', regex=False)
+        .str.replace(r'[*<>≥≤]', '', regex=True)
+    )
+    parsed = dict.fromkeys(raw_values, np.nan)
+    found = cleaned.str.extractall(r'(\d+\.?\d*)')[0]
+    for position, numbers in found.groupby(level=0):
+        numbers = [float(n) for n in numbers]
+        parsed[raw_values[position]] = round(sum(numbers) / len(numbers), 2)
+    return parsed
+
+
+def parse_values(series):
+    """
+    Bulk version of process_value for a whole column. Each distinct raw
+    string is parsed once and remembered for later loads.
+
+    Parameters:
+        series (pd.Series): Raw cell values.
+
+    Returns:
+        tuple: (pd.Series of floats, pd.Series of bool marking non-empty
+        cells that contained no number and so drop out of scoring).
+    """
+    present = series.notna()
+    raw = series[present].astype(str)
+
+    new_values = [v for v in raw.unique() if v not in _PARSE_MEMO]
+    if new_values:
+        if len(_PARSE_MEMO) + len(new_values) > _PARSE_MEMO_LIMIT:
+            _PARSE_MEMO.clear()
+        _PARSE_MEMO.update(_parse_unique(new_values))
+
+    values = pd.Series(np.nan, index=series.index, dtype=float)
+    values[present] = raw.map(_PARSE_MEMO).astype(float)
+    failed = present & values.isna()
+    return values, failed
+
+
+def compile_catalog(df_total):
+    """
+    Turns the raw "Clean Data" sheet into the ranking table.
+
+    Parameters:
+        df_total (pd.DataFrame): The sheet as read from the workbook.
+
+    Returns:
+        tuple: (ranking table with the numeric fields parsed, DataFrame of
+        parse-failure masks keyed by the parsed column).
+    """
+    df = df_total[KEEP_COLS].rename(columns=RENAME_DICT)
+    failures = {}
+
+    df['Tensile Strength-n'], failures['Tensile Strength'] = parse_values(df['Tensile Strength'])
+    df['Elongation at Break-n'], failures['Elongation at Break'] = parse_values(df['Elongation at Break'])
+    df['WVTR'], failures['WVTR'] = parse_values(df['WVTR'])
+    df['WVTR-2'], failures['WVTR-2'] = parse_values(df['WVTR-2'])
+
+    df['BBC'], failures['BBC'] = parse_values(df['BBC'])
+    return df, pd.DataFrame(failures, index=df.index)
+
+
+def parse_failure_report(catalog):
+    """
+    Lists the cells that had a value but no parseable number.
+
+    Returns:
+        pd.DataFrame: One row per failed cell with the grade, the column
+        and the raw text that was dropped from scoring.
+    """
+    rows = []
+    for column in catalog.parse_failures.columns:
+        failed = catalog.parse_failures[column].to_numpy()
+        for idx in np.flatnonzero(failed):
+            rows.append({
+                "Polymer Category": catalog.df["Polymer Category"].iat[idx],
+                "Polymer Grade": catalog.df["Polymer Grade"].iat[idx],
+                "Column": column,
+                "Raw Value": catalog.df_total[_raw_column(column)].iat[idx],
+            })
+    return pd.DataFrame(rows, columns=["Polymer Category", "Polymer Grade", "Column", "Raw Value"])
+
+
+def _raw_column(column):
+    for raw, renamed in RENAME_DICT.items():
+        if renamed == column:
+            return raw
+    return column
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _snapshot_paths(data_file):
+    snapshot_dir = os.path.join(os.path.dirname(data_file) or ".", SNAPSHOT_DIR_NAME)
+    stem = os.path.splitext(os.path.basename(data_file))[0]
+    return {
+        "dir": snapshot_dir,
+        "df": os.path.join(snapshot_dir, f"{stem}.catalog.parquet"),
+        "df_total": os.path.join(snapshot_dir, f"{stem}.detail.parquet"),
+        "parse_failures": os.path.join(snapshot_dir, f"{stem}.failures.parquet"),
+        "manifest": os.path.join(snapshot_dir, f"{stem}.manifest.json"),
+    }
+
+
+def _arrow_safe(df):
+    # Excel object columns mix numbers and text ("50" next to "30-35");
+    # Arrow needs one type per column, so render those cells as text.
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        values = df[col].dropna()
+        if values.map(type).nunique() > 1:
+            df[col] = df[col].map(lambda v: v if pd.isna(v) else str(v))
+    return df
+
+
+def _write_atomic(path, write):
+    tmp_path = f"{path}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _read_manifest(path):
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        return None
+    return manifest
+
+
+def _write_manifest(path, manifest):
+    def write(tmp_path):
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+    _write_atomic(path, write)
+
+
+def build_catalog(data_file):
+    """
+    Parses the workbook and writes the columnar snapshot next to it.
+
+    Parameters:
+        data_file (str): Path to the polymer database workbook.
+
+    Returns:
+        Catalog: The freshly compiled catalog.
+    """
+    paths = _snapshot_paths(data_file)
+    os.makedirs(paths["dir"], exist_ok=True)
+
+    stat = os.stat(data_file)
+    sha256 = _file_sha256(data_file)
+
+    df_total = _arrow_safe(pd.read_excel(data_file, sheet_name=CATALOG_SHEET))
+    df, parse_failures = compile_catalog(df_total)
+
+    _write_atomic(paths["df"], lambda p: df.to_parquet(p, engine="pyarrow", index=False))
+    _write_atomic(paths["df_total"], lambda p: df_total.to_parquet(p, engine="pyarrow", index=False))
+    _write_atomic(paths["parse_failures"], lambda p: parse_failures.to_parquet(p, engine="pyarrow", index=False))
+    _write_manifest(paths["manifest"], {
+        "format": SNAPSHOT_FORMAT,
+        "source": os.path.basename(data_file),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": sha256,
+    })
+    return Catalog(df, df_total, sha256[:12], parse_failures)
+
+
+def load_catalog(data_file):
+    """
+    Loads the catalog from its snapshot, rebuilding it only when the
+    source workbook has changed (mtime/size first, content hash second).
+
+    Parameters:
+        data_file (str): Path to the polymer database workbook.
+
+    Returns:
+        Catalog: Ranking table, detail table and catalog version.
+    """
+    paths = _snapshot_paths(data_file)
+    manifest = _read_manifest(paths["manifest"])
+    snapshot_ready = manifest is not None and all(
+        os.path.exists(paths[name]) for name in ("df", "df_total", "parse_failures")
+    )
+    if not snapshot_ready:
+        return build_catalog(data_file)
+
+    stat = os.stat(data_file)
+    if (stat.st_mtime_ns, stat.st_size) != (manifest["mtime_ns"], manifest["size"]):
+        # Touched but possibly unchanged (e.g. a fresh checkout): compare content
+        if _file_sha256(data_file) != manifest["sha256"]:
+            return build_catalog(data_file)
+        manifest.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        _write_manifest(paths["manifest"], manifest)
+
+    try:
+        df = pd.read_parquet(paths["df"], engine="pyarrow")
+        df_total = pd.read_parquet(paths["df_total"], engine="pyarrow")
+        parse_failures = pd.read_parquet(paths["parse_failures"], engine="pyarrow")
+    except Exception:
+        return build_catalog(data_file)
+    return Catalog(df, df_total, manifest["sha256"][:12], parse_failures)
+
+
+# Example usage: prebuild the snapshot, e.g. as a deploy step
+if __name__ == "__main__":
+    import sys
+    source = sys.argv[1] if len(sys.argv) > 1 else "data/Workflow #1 - Data Needs.xlsx"
+    catalog = build_catalog(source)
+    print(f"Compiled {len(catalog.df)} grades from {source} (version {catalog.version})")
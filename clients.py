@@ -0,0 +1,113 @@
+import os
+import threading
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Connections kept open per AWS client; Streamlit serves every session from
+# its own script thread, so size the pool for concurrent sessions
+AWS_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", 32))
+
+# Serve model calls from the local fake provider (fake_llm.py) instead
+LLM_FAKE_PROVIDER = os.getenv("LLM_FAKE_PROVIDER", "").lower() in ("1", "true", "yes")
+
+# Socket timeouts for model calls; llm_resilience handles retries, so the
+# SDKs' own retry loops are switched off for them
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", 5))     # seconds
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", 60))          # seconds
+
+# boto3 and the OpenAI SDK take about a second to import, so they are
+# imported when the first client is created rather than with this module
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _aws_config(**kwargs):
+    from botocore.config import Config
+
+    return Config(
+        max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        **kwargs
+    )
+
+
+def _aws_client(service_name, config=None, endpoint_url=None):
+    # boto3 sessions are not thread-safe, so each client gets its own session
+    # and is created under the registry lock; the clients themselves are
+    # safe to share between threads
+    import boto3
+
+    session = boto3.session.Session(
+        region_name=os.getenv('AWS_REGION'),
+        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
+    )
+    return session.client(service_name, config=config or _aws_config(), endpoint_url=endpoint_url)
+
+
+def _get_or_create(name, factory):
+    client = _clients.get(name)
+    if client is not None:
+        return client
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = factory()
+        return _clients[name]
+
+
+def get_bedrock_client():
+    """
+    Process-wide Bedrock runtime client.
+    """
+    if LLM_FAKE_PROVIDER:
+        import fake_llm
+        return _get_or_create("bedrock-runtime", lambda: fake_llm.FakeBedrockClient(fake_llm.default_provider()))
+    config = _aws_config(
+        connect_timeout=LLM_CONNECT_TIMEOUT,
+        read_timeout=LLM_READ_TIMEOUT,
+        retries={"mode": "standard", "max_attempts": 1},
+    )
+    return _get_or_create("bedrock-runtime", lambda: _aws_client('bedrock-runtime', config))
+
+
+def get_s3_client():
+    """
+    Process-wide S3 client. Set S3_ENDPOINT_URL to use an S3-compatible
+    store (e.g. a local MinIO) instead of AWS.
+    """
+    return _get_or_create("s3", lambda: _aws_client('s3', endpoint_url=os.getenv("S3_ENDPOINT_URL") or None))
+
+
+def get_openai_client():
+    """
+    Process-wide OpenAI client; it keeps its own keep-alive connection pool.
+    """
+    if LLM_FAKE_PROVIDER:
+        import fake_llm
+        return _get_or_create("openai", lambda: fake_llm.FakeOpenAIClient(fake_llm.default_provider()))
+    def create():
+        from openai import OpenAI
+
+        return OpenAI(timeout=LLM_READ_TIMEOUT, max_retries=0)
+
+    return _get_or_create("openai", create)
+
+
+def set_client(name, client):
+    """
+    Replaces the cached client for name ("bedrock-runtime", "s3" or
+    "openai"), e.g. with a fake_llm stand-in.
+    """
+    with _clients_lock:
+        _clients[name] = client
+
+
+def reset_clients():
+    """
+    Drops every cached client, e.g. after rotating credentials.
+    """
+    with _clients_lock:
+        _clients.clear()
@@ -0,0 +1,243 @@
+import json
+import math
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import NamedTuple
+
+import openai
+from botocore.exceptions import ClientError
+
+# Local stand-in for Bedrock and OpenAI, for offline runs and benchmarks.
+# clients.py hands these out instead of the real clients when
+# LLM_FAKE_PROVIDER is set, or install() swaps them in at runtime.
+
+FILLER = ("blending improves toughness by dispersing a ductile phase that absorbs impact energy "
+          "while the matrix keeps its stiffness and barrier performance").split()
+
+
+class FakeProviderConfig(NamedTuple):
+    latency_ms: float = 800.0       # median time to a full answer
+    latency_sigma: float = 0.5      # log-normal spread; 0 = fixed latency
+    first_token_ms: float = 300.0   # median time to the first streamed chunk
+    error_rate: float = 0.0         # share of requests failing with a 5xx
+    throttle_rate: float = 0.0      # share of requests throttled (429)
+    response_words: int = 120       # length of every answer
+    chunk_words: int = 4            # words per streamed chunk
+    seed: int = None
+
+
+def config_from_env():
+    """
+    FakeProviderConfig from LLM_FAKE_* environment variables.
+    """
+    seed = os.getenv("LLM_FAKE_SEED")
+    return FakeProviderConfig(
+        latency_ms=float(os.getenv("LLM_FAKE_LATENCY_MS", 800)),
+        latency_sigma=float(os.getenv("LLM_FAKE_LATENCY_SIGMA", 0.5)),
+        first_token_ms=float(os.getenv("LLM_FAKE_FIRST_TOKEN_MS", 300)),
+        error_rate=float(os.getenv("LLM_FAKE_ERROR_RATE", 0)),
+        throttle_rate=float(os.getenv("LLM_FAKE_THROTTLE_RATE", 0)),
+        response_words=int(os.getenv("LLM_FAKE_RESPONSE_WORDS", 120)),
+        seed=int(seed) if seed else None,
+    )
+
+
+class FakeProvider:
+    """
+    Shared behaviour of the fake clients: latency sampling, injected
+    failures, deterministic answers and call counting.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or config_from_env()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _draw(self):
+        with self._lock:
+            self.calls += 1
+            return self._rng.random(), self._rng.gauss(0, 1)
+
+    def _latency(self, median_ms, z):
+        return median_ms / 1000 * math.exp(self.config.latency_sigma * z)
+
+    def start(self, raise_throttled, raise_failed):
+        """
+        Decides one request's fate: raises the injected error, or returns
+        (seconds to first token, seconds to full answer).
+        """
+        roll, z = self._draw()
+        if roll < self.config.throttle_rate:
+            raise_throttled()
+        if roll < self.config.throttle_rate + self.config.error_rate:
+            raise_failed()
+        total = self._latency(self.config.latency_ms, z)
+        first = min(total, self._latency(self.config.first_token_ms, z))
+        return first, total
+
+    def answer(self, model, text):
+        """
+        Deterministic answer text for a request.
+        """
+        words = [f"[{model}]"] + [FILLER[i % len(FILLER)] for i in range(self.config.response_words)]
+        return f"{' '.join(words)} (re: {text[-60:].strip()})"
+
+    def chunks(self, answer, first, total):
+        """
+        Splits answer into streamed chunks, sleeping so the first arrives
+        after first seconds and the last after total seconds.
+        """
+        words = answer.split(" ")
+        size = self.config.chunk_words
+        pieces = [" ".join(words[i:i + size]) + (" " if i + size < len(words) else "")
+                  for i in range(0, len(words), size)]
+        time.sleep(first)
+        interval = (total - first) / max(len(pieces) - 1, 1)
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(interval)
+            yield piece
+
+
+def _bedrock_error(code, status):
+    def raise_error():
+        raise ClientError({"Error": {"Code": code, "Message": f"Fake {code}"},
+                           "ResponseMetadata": {"HTTPStatusCode": status}}, "InvokeModel")
+    return raise_error
+
+
+def _openai_error(error_class, status):
+    def raise_error():
+        response = SimpleNamespace(status_code=status, headers={}, request=None)
+        raise error_class(f"Fake {status} from OpenAI", response=response, body=None)
+    return raise_error
+
+
+class _Body:
+    def __init__(self, payload):
+        self._payload = json.dumps(payload).encode("utf-8")
+
+    def read(self):
+        return self._payload
+
+
+def _event(payload):
+    return {"chunk": {"bytes": json.dumps(payload).encode("utf-8")}}
+
+
+class FakeBedrockClient:
+    """
+    Answers invoke_model / invoke_model_with_response_stream in the
+    payload shapes of Claude (Messages API) and Titan text models.
+    """
+
+    def __init__(self, provider):
+        self.provider = provider
+
+    def _request(self, modelId, body):
+        request = json.loads(body)
+        if "titan" in modelId.lower():
+            text = request["inputText"]
+        else:
+            text = request["messages"][-1]["content"]
+        first, total = self.provider.start(_bedrock_error("ThrottlingException", 429),
+                                           _bedrock_error("InternalServerException", 500))
+        return self.provider.answer(modelId, text), first, total
+
+    def invoke_model(self, modelId, body, **kwargs):
+        answer, _, total = self._request(modelId, body)
+        time.sleep(total)
+        if "titan" in modelId.lower():
+            payload = {"results": [{"outputText": answer, "completionReason": "FINISH"}]}
+        else:
+            payload = {"content": [{"type": "text", "text": answer}], "stop_reason": "end_turn"}
+        return {"body": _Body(payload)}
+
+    def invoke_model_with_response_stream(self, modelId, body, **kwargs):
+        answer, first, total = self._request(modelId, body)
+        chunks = self.provider.chunks(answer, first, total)
+        if "titan" in modelId.lower():
+            events = (_event({"outputText": chunk, "index": 0}) for chunk in chunks)
+        else:
+            events = self._claude_events(chunks)
+        return {"body": events}
+
+    @staticmethod
+    def _claude_events(chunks):
+        yield _event({"type": "message_start"})
+        yield _event({"type": "content_block_start", "index": 0})
+        for chunk in chunks:
+            yield _event({"type": "content_block_delta", "index": 0,
+                          "delta": {"type": "text_delta", "text": chunk}})
+        yield _event({"type": "content_block_stop", "index": 0})
+        yield _event({"type": "message_stop"})
+
+
+class _FakeCompletions:
+    def __init__(self, provider):
+        self.provider = provider
+
+    def create(self, model, messages, stream=False, **params):
+        first, total = self.provider.start(_openai_error(openai.RateLimitError, 429),
+                                           _openai_error(openai.InternalServerError, 500))
+        answer = self.provider.answer(model, messages[-1]["content"])
+        if stream:
+            return self._stream(self.provider.chunks(answer, first, total))
+
+        time.sleep(total)
+        message = SimpleNamespace(role="assistant", content=answer)
+        return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")])
+
+    @staticmethod
+    def _stream(chunks):
+        for chunk in chunks:
+            delta = SimpleNamespace(content=chunk)
+            yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)])
+        yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=None),
+                                                       finish_reason="stop")])
+
+
+class FakeOpenAIClient:
+    """
+    Answers chat.completions.create in the OpenAI chat shape, streamed or not.
+    """
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.chat = SimpleNamespace(completions=_FakeCompletions(provider))
+
+
+_default_provider = None
+_default_lock = threading.Lock()
+
+
+def default_provider():
+    """
+    Process-wide FakeProvider configured from the environment.
+    """
+    global _default_provider
+    with _default_lock:
+        if _default_provider is None:
+            _default_provider = FakeProvider()
+        return _default_provider
+
+
+def install(provider=None):
+    """
+    Makes clients.py hand out fake Bedrock and OpenAI clients backed by
+    provider (default: configured from the environment).
+
+    Returns:
+        FakeProvider: The provider now in use.
+    """
+    import clients
+
+    provider = provider or default_provider()
+    clients.reset_clients()
+    clients.set_client("bedrock-runtime", FakeBedrockClient(provider))
+    clients.set_client("openai", FakeOpenAIClient(provider))
+    return provider
@@ -0,0 +1,262 @@
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# Root of everything the app writes about feedback: per-user folders
+# (results exports, analysis logs) and the feedback log below
+FEEDBACK_ROOT = os.getenv("FEEDBACK_ROOT", "data/feedback")
+# Feedback is appended to one JSONL file per day under live/, and a
+# compaction job rolls finished days into Parquet under
+# compacted/date=YYYY-MM-DD/. read_feedback() merges both.
+FEEDBACK_LOG_DIR = os.getenv("FEEDBACK_LOG_DIR", os.path.join(FEEDBACK_ROOT, "log"))
+FSYNC_INTERVAL = 0.2        # seconds between group commits
+
+FEEDBACK_COLUMNS = [
+    "id", "ts", "date", "user", "kind", "submission_id",
+    "polymer_category", "polymer_grade", "text",
+    "recommendation_score", "improvement_suggestions",
+    "doe_relevance_score", "doe_comments", "other_feedback",
+]
+
+
+def make_record(user, kind, submission_id=None, **fields):
+    """
+    Builds one feedback log record.
+
+    Parameters:
+        user (str): Who submitted the feedback.
+        kind (str): "polymer" (Feedback popover), "survey" (survey answers)
+            or "survey_polymer" (per-polymer notes sent with a survey).
+        submission_id (str): Groups the records of one submit.
+        **fields: Any other FEEDBACK_COLUMNS values.
+
+    Returns:
+        dict: The record, with every column present.
+    """
+    now = datetime.now(timezone.utc)
+    record = dict.fromkeys(FEEDBACK_COLUMNS)
+    record.update(fields)
+    record.update(
+        id=uuid.uuid4().hex,
+        ts=now.isoformat(),
+        date=now.strftime("%Y-%m-%d"),
+        user=user,
+        kind=kind,
+        submission_id=submission_id,
+    )
+    return record
+
+
+class FeedbackLog:
+    """
+    Append-only daily JSONL log. Writes are flushed at once and fsynced
+    in batches by a background thread; append(durable=True) waits for the
+    fsync that covers its records (group commit), and raises if that
+    fsync failed.
+    """
+
+    def __init__(self, log_dir=FEEDBACK_LOG_DIR, fsync_interval=FSYNC_INTERVAL):
+        self.live_dir = os.path.join(log_dir, "live")
+        self.fsync_interval = fsync_interval
+        os.makedirs(self.live_dir, exist_ok=True)
+
+        self._cond = threading.Condition()
+        self._file = None
+        self._file_date = None
+        self._written = 0           # records written (flushed to the OS)
+        self._synced = 0            # records known to be on disk
+        self._dirty = []            # files written since the last fsync
+        self._syncing = []          # files the syncer is fsyncing right now
+        self._failed = deque(maxlen=32)     # (first, last record, error) of failed commits
+
+        self._syncer = threading.Thread(target=self._sync_loop, name="feedback-log-fsync", daemon=True)
+        self._syncer.start()
+
+    def _open_for(self, date):
+        # Caller holds _cond
+        if self._file_date != date:
+            if self._file is not None and self._file not in self._dirty and self._file not in self._syncing:
+                self._file.close()
+            self._file = open(os.path.join(self.live_dir, f"{date}.jsonl"), "a", encoding="utf-8")
+            self._file_date = date
+        return self._file
+
+    def append(self, records, durable=True):
+        """
+        Appends records to today's log.
+
+        Parameters:
+            records (list): Records from make_record.
+            durable (bool): Wait until the records are fsynced.
+
+        Raises:
+            OSError: durable was set and the fsync covering the records
+                failed.
+        """
+        with self._cond:
+            for record in records:
+                f = self._open_for(record["date"])
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                f.flush()
+                if f not in self._dirty:
+                    self._dirty.append(f)
+            self._written += len(records)
+            target = self._written
+            self._cond.notify_all()
+            if durable:
+                while self._synced < target:
+                    self._cond.wait()
+                for first, last, error in self._failed:
+                    if first < target <= last:
+                        raise OSError(f"Feedback log fsync failed: {error}") from error
+
+    def _sync_loop(self):
+        while True:
+            with self._cond:
+                while self._written == self._synced:
+                    self._cond.wait()
+            # Let more writers join this commit before paying for the fsync
+            time.sleep(self.fsync_interval)
+            with self._cond:
+                first, target = self._synced, self._written
+                self._syncing, self._dirty = self._dirty, []
+            # Writers keep appending while the disk catches up
+            error = None
+            for f in self._syncing:
+                try:
+                    os.fsync(f.fileno())
+                except (OSError, ValueError) as e:
+                    error = error or e
+            with self._cond:
+                for f in self._syncing:
+                    if f is not self._file and f not in self._dirty:
+                        try:
+                            f.close()
+                        except OSError as e:
+                            error = error or e
+                self._syncing = []
+                # A failed commit still settles its records, so their
+                # writers raise instead of waiting forever
+                if error is not None:
+                    self._failed.append((first, target, error))
+                self._synced = target
+                self._cond.notify_all()
+
+
+_log = None
+_log_lock = threading.Lock()
+
+
+def get_feedback_log():
+    """
+    Process-wide FeedbackLog at FEEDBACK_LOG_DIR.
+    """
+    global _log
+    with _log_lock:
+        if _log is None:
+            _log = FeedbackLog()
+        return _log
+
+
+def log_feedback(records, durable=True):
+    """
+    Appends feedback records (see make_record) to the shared log.
+    """
+    get_feedback_log().append(records, durable=durable)
+
+
+def read_log_file(path):
+    """
+    Records of one live JSONL log file, skipping a torn last line.
+    """
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                continue        # torn last line from a crash mid-write
+    return pd.DataFrame(rows, columns=FEEDBACK_COLUMNS)
+
+
+def compact(log_dir=FEEDBACK_LOG_DIR, before=None):
+    """
+    Rolls every finished day's JSONL log into a Parquet file under
+    compacted/date=YYYY-MM-DD/ and removes the JSONL.
+
+    Parameters:
+        log_dir (str): Feedback log directory.
+        before (str): Only compact days before this YYYY-MM-DD date
+            (default: today, which may still be written to).
+
+    Returns:
+        list: Dates compacted.
+    """
+    before = before or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    compacted = []
+    for path in sorted(glob.glob(os.path.join(log_dir, "live", "*.jsonl"))):
+        date = os.path.splitext(os.path.basename(path))[0]
+        if date >= before:
+            continue
+        df = read_log_file(path)
+        if not df.empty:
+            partition = os.path.join(log_dir, "compacted", f"date={date}")
+            os.makedirs(partition, exist_ok=True)
+            target = os.path.join(partition, f"part-{uuid.uuid4().hex[:8]}.parquet")
+            df.drop(columns="date").astype({"recommendation_score": "Int64", "doe_relevance_score": "Int64"}) \
+                .to_parquet(f"{target}.tmp", engine="pyarrow", index=False)
+            os.replace(f"{target}.tmp", target)
+        os.remove(path)
+        compacted.append(date)
+    return compacted
+
+
+def read_feedback(log_dir=FEEDBACK_LOG_DIR, since=None, until=None, kinds=None):
+    """
+    One view over compacted and live feedback.
+
+    Parameters:
+        log_dir (str): Feedback log directory.
+        since, until (str): Inclusive YYYY-MM-DD bounds (None = open).
+        kinds (list): Only these record kinds (None = all).
+
+    Returns:
+        pd.DataFrame: FEEDBACK_COLUMNS, oldest first.
+    """
+    def wanted(date):
+        return (since is None or date >= since) and (until is None or date <= until)
+
+    frames = []
+    for partition in sorted(glob.glob(os.path.join(log_dir, "compacted", "date=*"))):
+        date = os.path.basename(partition)[len("date="):]
+        if wanted(date):
+            for part in sorted(glob.glob(os.path.join(partition, "*.parquet"))):
+                frames.append(pd.read_parquet(part, engine="pyarrow").assign(date=date))
+    for path in sorted(glob.glob(os.path.join(log_dir, "live", "*.jsonl"))):
+        if wanted(os.path.splitext(os.path.basename(path))[0]):
+            frames.append(read_log_file(path))
+
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=FEEDBACK_COLUMNS)
+    df = pd.concat([frame[FEEDBACK_COLUMNS].astype(object) for frame in frames], ignore_index=True)
+    # A compaction interrupted between writing Parquet and deleting the
+    # JSONL leaves the same records in both
+    df = df.drop_duplicates(subset="id", keep="first")
+    if kinds is not None:
+        df = df[df["kind"].isin(kinds)]
+    return df.sort_values("ts", kind="stable").reset_index(drop=True)
+
+
+# Example usage: run as a periodic job, e.g. from cron
+if __name__ == "__main__":
+    import sys
+    log_dir = sys.argv[1] if len(sys.argv) > 1 else FEEDBACK_LOG_DIR
+    print(f"Compacted {compact(log_dir) or 'nothing'} in {log_dir}")
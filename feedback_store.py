@@ -0,0 +1,370 @@
+import glob
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from feedback_log import FEEDBACK_COLUMNS, FEEDBACK_ROOT, read_log_file
+from table_export import read_table
+
+# Indexed copy of everything under FEEDBACK_ROOT: the legacy per-submit
+# .txt files, results exports and the JSONL/Parquet feedback log. ingest()
+# only reads files that are new or changed since the last run.
+FEEDBACK_DB_PATH = os.getenv("FEEDBACK_DB_PATH", "data/.feedback/feedback.sqlite3")
+# Bumped when parsing changes, so existing stores re-read every file
+STORE_VERSION = 1
+
+# Record kinds that carry a comment about one polymer
+POLYMER_KINDS = ("polymer", "survey_polymer")
+
+STORE_COLUMNS = [
+    "id", "ts", "source", "user", "kind", "submission_id",
+    "polymer_category", "polymer_grade", "text",
+    "recommendation_score", "improvement_suggestions",
+    "doe_relevance_score", "doe_comments", "other_feedback",
+    "overall_rating",
+]
+
+_TS = r"(\d{8}-\d{6})"
+SURVEY_FILE = re.compile(rf"^feedback_survey_{_TS}\.txt$")
+POLYMER_FILE = re.compile(rf"^feedback_for_(.+?)_(.+)_(\d+)(?:_{_TS})?\.txt$")
+ROW_FILE = re.compile(rf"^feedback_(\d+)_{_TS}\.txt$")
+LEGACY_TABLE_FILE = re.compile(rf"^feedback(?:_table)?_{_TS}\.txt$")
+RESULTS_FILE = re.compile(rf"^results_{_TS}\.(?:xlsx|csv|parquet)$")
+SURVEY_POLYMER_LINE = re.compile(r"^(.+?) - (.+?): (.*)$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT UNIQUE,
+    ts TEXT,
+    source TEXT NOT NULL,
+    user TEXT,
+    kind TEXT NOT NULL,
+    submission_id TEXT,
+    polymer_category TEXT,
+    polymer_grade TEXT,
+    text TEXT,
+    recommendation_score REAL,
+    improvement_suggestions TEXT,
+    doe_relevance_score REAL,
+    doe_comments TEXT,
+    other_feedback TEXT,
+    overall_rating REAL
+);
+CREATE INDEX IF NOT EXISTS feedback_user ON feedback (user, ts);
+CREATE INDEX IF NOT EXISTS feedback_polymer ON feedback (polymer_category, polymer_grade, ts);
+CREATE INDEX IF NOT EXISTS feedback_ts ON feedback (ts);
+CREATE INDEX IF NOT EXISTS feedback_kind_ts ON feedback (kind, ts);
+CREATE INDEX IF NOT EXISTS feedback_source ON feedback (source);
+CREATE TABLE IF NOT EXISTS ingested_files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    ingested_at REAL NOT NULL
+);
+"""
+
+
+def _stamp(text):
+    return datetime.strptime(text, "%Y%m%d-%H%M%S").isoformat()
+
+
+def _read_text(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _field(lines, label):
+    # "Label: value" -> value, or None when the line is missing
+    for line in lines:
+        if line.startswith(f"{label}:"):
+            return line[len(label) + 1:].strip()
+    return None
+
+
+def _score(value):
+    match = re.match(r"\s*(\d+(?:\.\d+)?)", value or "")
+    return float(match.group(1)) if match else None
+
+
+def _record(source, user, kind, ts, **fields):
+    record = dict.fromkeys(STORE_COLUMNS)
+    record.update(fields, source=source, user=user, kind=kind, ts=ts)
+    return record
+
+
+def parse_feedback_file(path, root=FEEDBACK_ROOT):
+    """
+    Turns one file of the feedback tree into store records.
+
+    Parameters:
+        path (str): File under root.
+        root (str): The feedback tree; the first folder below it is the user.
+
+    Returns:
+        list: Record dicts (STORE_COLUMNS); empty for files that hold no
+        feedback (analysis logs, .DS_Store, ...).
+    """
+    rel = os.path.relpath(path, root)
+    parts = rel.split(os.sep)
+    name = parts[-1]
+
+    # Feedback log written by feedback_log.py
+    if parts[0] == "log":
+        if name.endswith(".jsonl"):
+            df = read_log_file(path)
+        elif name.endswith(".parquet"):
+            df = pd.read_parquet(path, engine="pyarrow")
+        else:
+            return []
+        return [_record(rel, row.get("user"), row.get("kind"), row.get("ts"),
+                        **{col: row.get(col) for col in FEEDBACK_COLUMNS if col not in ("ts", "date", "user", "kind")})
+                for row in df.astype(object).where(df.notna(), None).to_dict("records")]
+
+    # data/feedback/<user>/... or, for some polymer notes, for_Polymers/<user>/...
+    folders = parts[1:-1] if parts[0] == "for_Polymers" else parts[:-1]
+    user = folders[0] if folders else None
+
+    match = SURVEY_FILE.match(name)
+    if match:
+        ts = _stamp(match.group(1))
+        submission_id = f"{user}-{match.group(1)}"
+        lines = _read_text(path).splitlines()
+        records = [_record(
+            rel, user, "survey", ts, submission_id=submission_id,
+            recommendation_score=_score(_field(lines, "Recommendation Likelihood")),
+            improvement_suggestions=_field(lines, "Improvement Suggestions"),
+            doe_relevance_score=_score(_field(lines, "DOE Relevance Score")),
+            doe_comments=_field(lines, "DOE Comments"),
+            other_feedback=_field(lines, "Other Feedback"),
+        )]
+        if "--- Polymer-Specific Feedback ---" in lines:
+            for line in lines[lines.index("--- Polymer-Specific Feedback ---") + 1:]:
+                polymer = SURVEY_POLYMER_LINE.match(line)
+                if polymer:
+                    records.append(_record(rel, user, "survey_polymer", ts, submission_id=submission_id,
+                                           polymer_category=polymer.group(1), polymer_grade=polymer.group(2),
+                                           text=polymer.group(3).strip()))
+        return records
+
+    match = POLYMER_FILE.match(name)
+    if match:
+        # Early notes carry no timestamp; the file mtime is only when it
+        # was checked out or copied, so leave ts empty
+        ts = _stamp(match.group(4)) if match.group(4) else None
+        return [_record(rel, user, "polymer", ts, polymer_category=match.group(1),
+                        polymer_grade=match.group(2), text=_read_text(path).strip())]
+
+    match = ROW_FILE.match(name)
+    if match:
+        # Early format: only the table row index was recorded
+        return [_record(rel, user, "polymer", _stamp(match.group(2)), text=_read_text(path).strip())]
+
+    match = LEGACY_TABLE_FILE.match(name)
+    if match:
+        # Early survey format: "Polymer_N: ..." lines and an overall rating
+        ts = _stamp(match.group(1))
+        submission_id = f"{user}-{match.group(1)}"
+        lines = _read_text(path).splitlines()
+        records = [_record(rel, user, "survey", ts, submission_id=submission_id,
+                           overall_rating=_score(_field(lines, "Final Rating") or _field(lines, "Overall Rating")),
+                           other_feedback=_field(lines, "Final Feedback"))]
+        for line in lines:
+            label, _, text = line.partition(":")
+            if label.startswith("Polymer_") and text.strip():
+                records.append(_record(rel, user, "survey_polymer", ts, submission_id=submission_id,
+                                       polymer_category=label, text=text.strip()))
+        return records
+
+    match = RESULTS_FILE.match(name)
+    if match:
+        # Results export of a survey; its comments repeat the survey's, so
+        # they are kept under their own kind
+        df = read_table(path)
+        if not {"Polymer Category", "Polymer Grade", "Feedback"} <= set(df.columns):
+            return []
+        ts = _stamp(match.group(1))
+        df = df[df["Feedback"].notna() & (df["Feedback"].astype(str).str.strip() != "")]
+        return [_record(rel, user, "results", ts, submission_id=f"{user}-{match.group(1)}",
+                        polymer_category=cat, polymer_grade=grade, text=str(text).strip())
+                for cat, grade, text in zip(df["Polymer Category"], df["Polymer Grade"], df["Feedback"])]
+
+    return []
+
+
+class FeedbackStore:
+    """
+    SQLite feedback store indexed on user, polymer and timestamp.
+    """
+
+    def __init__(self, path=FEEDBACK_DB_PATH, root=FEEDBACK_ROOT):
+        self.path = path
+        self.root = root
+        self._lock = threading.Lock()
+        self.last_ingest = 0.0
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < STORE_VERSION:
+            with self._conn:
+                self._conn.execute("DELETE FROM feedback")
+                self._conn.execute("DELETE FROM ingested_files")
+                self._conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+
+    def _files(self):
+        for path in glob.glob(os.path.join(self.root, "**", "*"), recursive=True):
+            if os.path.isfile(path) and not os.path.basename(path).startswith("."):
+                yield path
+
+    def ingest(self):
+        """
+        Loads new and changed files and forgets deleted ones; unchanged
+        files (same mtime and size) are not opened.
+
+        Returns:
+            dict: Counts of files ingested, removed and records added.
+        """
+        with self._lock:
+            known = {path: (mtime_ns, size) for path, mtime_ns, size in
+                     self._conn.execute("SELECT path, mtime_ns, size FROM ingested_files")}
+            seen = set()
+            stats = {"files": 0, "removed": 0, "records": 0}
+
+            with self._conn:
+                changed = []
+                for path in self._files():
+                    rel = os.path.relpath(path, self.root)
+                    seen.add(rel)
+                    stat = os.stat(path)
+                    if known.get(rel) != (stat.st_mtime_ns, stat.st_size):
+                        changed.append((path, rel, stat))
+
+                # Drop vanished files first, so a log day compacted to
+                # Parquet doesn't collide with its old JSONL rows
+                for rel in set(known) - seen:
+                    self._conn.execute("DELETE FROM feedback WHERE source = ?", (rel,))
+                    self._conn.execute("DELETE FROM ingested_files WHERE path = ?", (rel,))
+                    stats["removed"] += 1
+
+                for path, rel, stat in changed:
+                    try:
+                        records = parse_feedback_file(path, self.root)
+                    except Exception:
+                        continue        # unreadable or half-written; retried next run
+                    self._conn.execute("DELETE FROM feedback WHERE source = ?", (rel,))
+                    self._conn.executemany(
+                        f"INSERT OR IGNORE INTO feedback ({', '.join(STORE_COLUMNS)}) "
+                        f"VALUES ({', '.join('?' * len(STORE_COLUMNS))})",
+                        [tuple(record[col] for col in STORE_COLUMNS) for record in records],
+                    )
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO ingested_files (path, mtime_ns, size, ingested_at) VALUES (?, ?, ?, ?)",
+                        (rel, stat.st_mtime_ns, stat.st_size, time.time()),
+                    )
+                    stats["files"] += 1
+                    stats["records"] += len(records)
+
+            self.last_ingest = time.time()
+            return stats
+
+    def ingest_if_stale(self, max_age=60):
+        """
+        Runs ingest() unless it ran within the last max_age seconds.
+        """
+        if time.time() - self.last_ingest >= max_age:
+            return self.ingest()
+        return None
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def polymer_feedback_counts(self, kinds=POLYMER_KINDS):
+        """
+        Number of comments and distinct users per polymer grade. Comments
+        that name no polymer (early row-index feedback) are left out.
+
+        Returns:
+            pd.DataFrame: polymer_category, polymer_grade, comments, users, last_ts.
+        """
+        marks = ", ".join("?" * len(kinds))
+        return self._query(
+            f"SELECT polymer_category, polymer_grade, COUNT(*) AS comments, "
+            f"COUNT(DISTINCT user) AS users, MAX(ts) AS last_ts FROM feedback "
+            f"WHERE kind IN ({marks}) AND text IS NOT NULL AND text != '' AND polymer_category IS NOT NULL "
+            f"GROUP BY polymer_category, polymer_grade ORDER BY comments DESC, last_ts DESC NULLS LAST",
+            tuple(kinds),
+        )
+
+    def score_summary(self, by_user=False):
+        """
+        Mean recommendation and DOE relevance scores over all surveys.
+
+        Parameters:
+            by_user (bool): One row per user instead of one overall row.
+
+        Returns:
+            pd.DataFrame: surveys, mean_recommendation, mean_doe_relevance
+            (and user when by_user).
+        """
+        group = "user, " if by_user else ""
+        return self._query(
+            f"SELECT {group}COUNT(*) AS surveys, "
+            f"ROUND(AVG(recommendation_score), 2) AS mean_recommendation, "
+            f"ROUND(AVG(doe_relevance_score), 2) AS mean_doe_relevance "
+            f"FROM feedback WHERE kind = 'survey'"
+            + (" GROUP BY user ORDER BY user" if by_user else "")
+        )
+
+    def recent_comments(self, limit=20, polymer_category=None, polymer_grade=None, user=None,
+                        kinds=POLYMER_KINDS):
+        """
+        Latest non-empty polymer comments, optionally for one polymer or
+        user; undated comments come last.
+
+        Returns:
+            pd.DataFrame: ts, user, polymer_category, polymer_grade, text, kind.
+        """
+        where = [f"kind IN ({', '.join('?' * len(kinds))})", "text IS NOT NULL", "text != ''"]
+        params = list(kinds)
+        for column, value in (("polymer_category", polymer_category),
+                              ("polymer_grade", polymer_grade), ("user", user)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        params.append(limit)
+        return self._query(
+            f"SELECT ts, user, polymer_category, polymer_grade, text, kind FROM feedback "
+            f"WHERE {' AND '.join(where)} ORDER BY ts DESC NULLS LAST LIMIT ?",
+            tuple(params),
+        )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_feedback_store():
+    """
+    Process-wide FeedbackStore at FEEDBACK_DB_PATH.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FeedbackStore()
+        return _store
+
+
+# Example usage: ingest the feedback tree and print a summary
+if __name__ == "__main__":
+    store = get_feedback_store()
+    print(store.ingest())
+    print(store.score_summary(by_user=True).to_string(index=False))
+    print(store.polymer_feedback_counts().head(10).to_string(index=False))
@@ -0,0 +1,222 @@
+import json
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+
+from clients import get_s3_client
+
+# Feedback files are written locally first and uploaded to S3 in the
+# background. Every upload is recorded in a JSONL write-ahead journal
+# before the submit returns, so nothing is lost if S3 is unreachable or
+# the app restarts; a worker thread replays whatever is still pending.
+FEEDBACK_BUCKET = os.getenv("FEEDBACK_BUCKET", "feedbackworkflow1")
+JOURNAL_PATH = os.getenv("FEEDBACK_JOURNAL_PATH", "data/.feedback/upload_journal.jsonl")
+# Where earlier versions kept the journal, inside the feedback tree
+LEGACY_JOURNAL_PATH = "Data/Feedback/.upload_journal.jsonl"
+UPLOAD_BATCH_SIZE = 16
+RETRY_BASE = 1.0            # seconds
+RETRY_CAP = 300.0           # seconds
+# Rewrite the journal once this many finished entries have piled up
+COMPACT_AFTER = 200
+
+
+class FeedbackUploader:
+    """
+    Durable queue of S3 uploads drained by one background thread.
+    """
+
+    def __init__(self, journal_path=JOURNAL_PATH, client_factory=get_s3_client):
+        self.journal_path = journal_path
+        self.client_factory = client_factory
+        self._journal_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._pending = {}              # entry id -> journal entry
+        self._finished_lines = 0
+        self.uploaded = 0
+        self.failures = 0
+        self.last_error = None
+
+        os.makedirs(os.path.dirname(journal_path) or ".", exist_ok=True)
+        for entry in self._replay():
+            self._pending[entry["id"]] = entry
+            self._queue.put(entry)
+
+        self._worker = threading.Thread(target=self._run, name="feedback-uploader", daemon=True)
+        self._worker.start()
+
+    # --- journal ---
+
+    def _replay(self):
+        entries = {}
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue        # torn last line from a crash mid-write
+                    if record.get("op") == "upload":
+                        entries[record["id"]] = record
+                    else:
+                        entries.pop(record.get("id"), None)
+                        self._finished_lines += 2
+        except FileNotFoundError:
+            pass
+        return list(entries.values())
+
+    def _append(self, records):
+        # Caller holds _journal_lock; one fsync per call
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _compact(self):
+        # Caller holds _journal_lock: keep only the unfinished uploads
+        tmp_path = f"{self.journal_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self._pending.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+        self._finished_lines = 0
+
+    # --- producer side ---
+
+    def enqueue(self, uploads):
+        """
+        Journals uploads and hands them to the worker; returns once they
+        are on disk, without waiting for S3.
+
+        Parameters:
+            uploads (list): dicts with "key" and either "file" (local path,
+                streamed from disk by the worker) or "body" (short text to
+                store), optionally "bucket". Exports go in as files so the
+                journal only holds a pointer to them.
+
+        Returns:
+            list: The journal entry ids.
+        """
+        entries = []
+        for upload in uploads:
+            entry = {
+                "op": "upload",
+                "id": uuid.uuid4().hex,
+                "bucket": upload.get("bucket", FEEDBACK_BUCKET),
+                "key": upload["key"],
+                "created_at": time.time(),
+            }
+            if "file" in upload:
+                entry["file"] = os.path.abspath(upload["file"])
+            else:
+                entry["body"] = upload["body"]
+            entries.append(entry)
+
+        with self._journal_lock:
+            self._append(entries)
+            for entry in entries:
+                self._pending[entry["id"]] = entry
+        for entry in entries:
+            self._queue.put(entry)
+        return [entry["id"] for entry in entries]
+
+    # --- worker side ---
+
+    def _upload(self, client, entry):
+        if "file" in entry:
+            client.upload_file(entry["file"], entry["bucket"], entry["key"])
+        else:
+            client.put_object(Bucket=entry["bucket"], Key=entry["key"], Body=entry["body"])
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < UPLOAD_BATCH_SIZE:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        attempt = 0
+        while True:
+            batch = self._next_batch()
+            finished, retry = [], []
+            client = None
+            for entry in batch:
+                try:
+                    client = client or self.client_factory()
+                    self._upload(client, entry)
+                    finished.append({"op": "done", "id": entry["id"]})
+                except FileNotFoundError as e:
+                    # The local file is gone; retrying can never succeed
+                    self.last_error = f"{entry['key']}: {e}"
+                    finished.append({"op": "failed", "id": entry["id"], "error": str(e)})
+                except Exception as e:
+                    self.last_error = f"{entry['key']}: {e}"
+                    retry.append(entry)
+
+            with self._journal_lock:
+                if finished:
+                    self._append(finished)
+                    for record in finished:
+                        self._pending.pop(record["id"], None)
+                    self._finished_lines += 2 * len(finished)
+                    if self._finished_lines >= COMPACT_AFTER:
+                        self._compact()
+            self.uploaded += sum(record["op"] == "done" for record in finished)
+
+            if retry:
+                self.failures += 1
+                delay = random.uniform(0, min(RETRY_CAP, RETRY_BASE * 2 ** attempt))
+                attempt += 1
+                time.sleep(delay)
+                for entry in retry:
+                    self._queue.put(entry)
+            else:
+                attempt = 0
+
+    def stats(self):
+        with self._journal_lock:
+            pending = len(self._pending)
+        return {"pending": pending, "uploaded": self.uploaded,
+                "failed_batches": self.failures, "last_error": self.last_error}
+
+
+_uploader = None
+_uploader_lock = threading.Lock()
+
+
+def get_uploader():
+    """
+    Process-wide FeedbackUploader; starting it resumes uploads left in the
+    journal by a previous run.
+    """
+    global _uploader
+    with _uploader_lock:
+        if _uploader is None:
+            # Carry over uploads still pending in a journal at the old location
+            if os.path.exists(LEGACY_JOURNAL_PATH) and not os.path.exists(JOURNAL_PATH):
+                os.makedirs(os.path.dirname(JOURNAL_PATH) or ".", exist_ok=True)
+                os.replace(LEGACY_JOURNAL_PATH, JOURNAL_PATH)
+            _uploader = FeedbackUploader()
+        return _uploader
+
+
+def enqueue_uploads(uploads):
+    """
+    Queues feedback uploads to S3 without waiting for them.
+
+    Parameters:
+        uploads (list): dicts with "key" and either "file" or "body";
+            "bucket" defaults to FEEDBACK_BUCKET.
+
+    Returns:
+        list: The journal entry ids.
+    """
+    return get_uploader().enqueue(uploads)
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Persistent cache of LLM responses, shared by every function in llm_handler
+DEFAULT_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "data/.llm_cache/responses.sqlite3")
+DEFAULT_TTL = int(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600))          # seconds
+MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000))
+CACHE_DISABLED = os.getenv("LLM_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+
+def make_cache_key(model, system_prompt, user_input, params):
+    """
+    Stable hash of everything that determines a model's answer.
+
+    Parameters:
+        model (str): Model name or Bedrock model id.
+        system_prompt (str): Prompt/context sent with the request.
+        user_input (str): The user's question.
+        params (dict): Generation parameters (temperature, max tokens, ...).
+
+    Returns:
+        str: Hex sha256 digest.
+    """
+    payload = json.dumps(
+        {"model": model, "system": system_prompt, "user": user_input, "params": params},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite-backed response cache with per-entry TTL and least-recently-used
+    eviction once more than max_entries responses are stored. Safe to share
+    between Streamlit session threads.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=MAX_ENTRIES, default_ttl=DEFAULT_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    def get(self, key):
+        """
+        Returns the cached response, or None if missing or expired.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def contains(self, key):
+        """
+        True if an unexpired response is stored; does not count as a hit.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None and (row[0] is None or row[0] > time.time())
+
+    def set(self, key, response, model=None, ttl=None):
+        """
+        Stores a response. ttl is in seconds; None uses the default TTL and
+        0 keeps the entry until it is evicted.
+        """
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, now, expires_at, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def stats(self):
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return {"entries": count, "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Process-wide LLMCache at DEFAULT_CACHE_PATH, created on first use.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+
+def cached_call(compute, model, system_prompt, user_input, params, use_cache=True, refresh=False, ttl=None,
+                answered_by=None):
+    """
+    Returns the cached response for the request, or calls compute() and
+    caches its result. Exceptions from compute() are not cached.
+
+    Parameters:
+        compute (callable): Performs the actual model call; returns str.
+        model, system_prompt, user_input, params: Parts of the cache key.
+        use_cache (bool): False bypasses the cache entirely.
+        refresh (bool): True skips the lookup but stores the new response.
+        ttl (int): Seconds to keep the response (None = default TTL).
+        answered_by (callable): Called after compute() when the response
+            may come from another model (a hedged request); returns that
+            model and its params, and the response is cached under their
+            key rather than the requested model's.
+
+    Returns:
+        str: The model response.
+    """
+    if not use_cache or CACHE_DISABLED:
+        return compute()
+
+    cache = get_cache()
+    key = make_cache_key(model, system_prompt, user_input, params)
+    if not refresh:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    response = compute()
+    if answered_by is not None:
+        model, params = answered_by()
+        key = make_cache_key(model, system_prompt, user_input, params)
+    cache.set(key, response, model=model, ttl=ttl)
+    return response
+
+
+def cached_stream(stream, model, system_prompt, user_input, params, use_cache=True, refresh=False, ttl=None):
+    """
+    Streaming counterpart of cached_call: yields the cached response as a
+    single chunk, or the chunks of stream() as they arrive and caches the
+    joined text once the stream has finished. A stream that raises part
+    way through is not cached.
+
+    Parameters:
+        stream (callable): Starts the model call; returns an iterator of str.
+        model, system_prompt, user_input, params: Parts of the cache key.
+        use_cache (bool): False bypasses the cache entirely.
+        refresh (bool): True skips the lookup but stores the new response.
+        ttl (int): Seconds to keep the response (None = default TTL).
+
+    Yields:
+        str: Response text chunks.
+    """
+    if not use_cache or CACHE_DISABLED:
+        yield from stream()
+        return
+
+    cache = get_cache()
+    key = make_cache_key(model, system_prompt, user_input, params)
+    if not refresh:
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    chunks = []
+    for chunk in stream():
+        chunks.append(chunk)
+        yield chunk
+    cache.set(key, "".join(chunks), model=model, ttl=ttl)
@@ -1,13 +1,34 @@
-import boto3
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import NamedTuple
 from dotenv import load_dotenv
-from openai import OpenAI
-from dotenv import load_dotenv
+from clients import get_bedrock_client, get_openai_client
+from llm_cache import cached_call, cached_stream
+from llm_resilience import LLMError, classify_error, resilient_call, resilient_stream
 
 # Load environment variables from .env file
 load_dotenv()
 
+CLAUDE_SONNET_MODEL_ID = "anthropic.claude-3-sonnet-20240229-v1:0"
+
+# Requests call_llm_many keeps in flight at once
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+
+# Model call_llm hedges slow requests to (e.g. a Bedrock model for GPT); off when empty
+LLM_HEDGE_MODEL = os.getenv("LLM_HEDGE_MODEL") or None
+
+
+class LLMRequest(NamedTuple):
+    user_input: str
+    prompt: str
+    llm_model_name: str
+
+
+class LLMResult(NamedTuple):
+    text: str          # model response, None if the request failed
+    error: LLMError    # what went wrong, None on success
+
 # load prompt engineering context
 def load_prompt_context():
     """
@@ -20,25 +41,24 @@ def load_prompt_context():
         return ""
 
 
-def get_material_details(material_type):
+def get_material_details(material_type, use_cache=True, refresh=False, ttl=None,
+                         deadline=None, raise_errors=False):
     """
     Fetches material details using AWS Bedrock's Claude-3 Sonnet model via the Messages API.
 
     Parameters:
         material_type (str): The type of material to query.
+        use_cache (bool): Reuse a cached response for the same request.
+        refresh (bool): Skip the cached response and store a fresh one.
+        ttl (int): Seconds to keep the response cached (None = default).
+        deadline (float): Seconds before giving up, retries included
+            (None = LLM_DEADLINE).
+        raise_errors (bool): Raise LLMError instead of returning an error message.
 
     Returns:
         str: Generated text response from the model.
     """
     try:
-        # Initialize the Bedrock runtime client
-        client = boto3.client(
-            'bedrock-runtime',
-            region_name=os.getenv('AWS_REGION'),  # Ensure the region is set
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
-        )
-
         # Define the conversation as a list of messages (Claude-3 requires Messages API)
         messages = [
             {"role": "user", "content": f"Tell me about the material: {material_type}. Provide a brief description including its properties, uses, and sustainability aspects. Give me only 1 sentence for response!"}
@@ -47,177 +67,381 @@ def get_material_details(material_type):
         # messages = [
         #     {"role": "user", "content": f"{material_type}. Give me only 1 sentence for response!"}
         # ]
-        # Prepare request payload for Messages API
-        payload = json.dumps({
-            "anthropic_version": "bedrock-2023-05-31",  # Required for Claude in Bedrock
-            "messages": messages,  # Use messages instead of prompt
+        params = {
             "max_tokens": 500,  # Controls response length
             "temperature": 0.5,  # Adjust randomness
-        })
+        }
 
-        # Invoke the model (Claude-3 requires Messages API)
-        response = client.invoke_model(
-            modelId="anthropic.claude-3-sonnet-20240229-v1:0",
-            body=payload,
-            accept="application/json",
-            contentType="application/json"
-        )
+        def invoke():
+            # Shared Bedrock runtime client
+            client = get_bedrock_client()
 
-        # Parse the response
-        response_body = json.loads(response['body'].read().decode("utf-8"))
+            # Prepare request payload for Messages API
+            payload = json.dumps({
+                "anthropic_version": "bedrock-2023-05-31",  # Required for Claude in Bedrock
+                "messages": messages,  # Use messages instead of prompt
+                **params,
+            })
 
-        # Extract the generated text (Claude-3 responses are under 'content')
-        details = response_body["content"][0]["text"] if "content" in response_body else "No details found."
-        return details
+            # Invoke the model (Claude-3 requires Messages API)
+            response = client.invoke_model(
+                modelId=CLAUDE_SONNET_MODEL_ID,
+                body=payload,
+                accept="application/json",
+                contentType="application/json"
+            )
+
+            # Parse the response
+            response_body = json.loads(response['body'].read().decode("utf-8"))
+
+            # Extract the generated text (Claude-3 responses are under 'content')
+            details = response_body["content"][0]["text"] if "content" in response_body else "No details found."
+            return details
+
+        return cached_call(lambda: resilient_call(lambda model: invoke(), CLAUDE_SONNET_MODEL_ID, deadline),
+                           CLAUDE_SONNET_MODEL_ID, "", messages[0]["content"], params,
+                           use_cache=use_cache, refresh=refresh, ttl=ttl)
 
     except Exception as e:
+        if raise_errors:
+            raise classify_error(e, CLAUDE_SONNET_MODEL_ID) from e
         return f"Error retrieving material details: {str(e)}"
     
 
 # Function to get answer from ZYAssistant
-def get_answer_from_zya(user_input):
+def get_answer_from_zya(user_input, use_cache=True, refresh=False, ttl=None,
+                        deadline=None, raise_errors=False):
     """
     Fetches answer from ZYAssistant using AWS Bedrock's Claude-3 Sonnet model via the Messages API.
 
     Parameters:
         user_input (str): The user's input question.
+        use_cache (bool): Reuse a cached response for the same request.
+        refresh (bool): Skip the cached response and store a fresh one.
+        ttl (int): Seconds to keep the response cached (None = default).
+        deadline (float): Seconds before giving up, retries included
+            (None = LLM_DEADLINE).
+        raise_errors (bool): Raise LLMError instead of returning an error message.
 
     Returns:
         str: Generated text response from the model.
     """
     try:
-        # Initialize the Bedrock runtime client
-        client = boto3.client(
-            'bedrock-runtime',
-            region_name=os.getenv('AWS_REGION'),  # Ensure the region is set
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
-        )
-
         # Load prompt context
         context = load_prompt_context()
         messages = [
             {"role": "user", "content": f"{context}\n{user_input}. Provide a 1-sentence description of its properties, uses, and sustainability aspects."}
         ]
+        params = {
+            "max_tokens": 500,
+            "temperature": 0.5,
+        }
+
+        def invoke():
+            # Shared Bedrock runtime client
+            client = get_bedrock_client()
+
+            payload = json.dumps({
+                "anthropic_version": "bedrock-2023-05-31",
+                "messages": messages,
+                **params,
+            })
 
+            # Invoke the model
+            response = client.invoke_model(
+                modelId=CLAUDE_SONNET_MODEL_ID,
+                body=payload,
+                accept="application/json",
+                contentType="application/json"
+            )
+
+            response_body = json.loads(response['body'].read().decode("utf-8"))
+            details = response_body["content"][0]["text"] if "content" in response_body else "No details found."
+            return details
+
+        return cached_call(lambda: resilient_call(lambda model: invoke(), CLAUDE_SONNET_MODEL_ID, deadline),
+                           CLAUDE_SONNET_MODEL_ID, context, messages[0]["content"], params,
+                           use_cache=use_cache, refresh=refresh, ttl=ttl)
+    
+    except Exception as e:
+        if raise_errors:
+            raise classify_error(e, CLAUDE_SONNET_MODEL_ID) from e
+        return f"Error retrieving material details: {str(e)}"
+
+def generation_params(llm_model_name):
+    """
+    Generation parameters call_llm sends for a model; part of the cache key.
+    """
+    name = llm_model_name.lower()
+    if "claude" in name:
+        return {"max_tokens": 2048, "temperature": 0}
+    if "titan" in name:
+        return {"maxTokenCount": 3072, "stopSequences": [], "temperature": 0, "topP": 0.9}
+    if "gpt" in name:
+        return {"temperature": 0}
+    raise ValueError("Unsupported model specified.")
+
+def _invoke_llm(user_input, prompt, llm_model_name):
+    if "gpt" in llm_model_name.lower():
+        # Shared OpenAI client
+        client = get_openai_client()
+        
+    else:
+        # Shared Bedrock runtime client
+        client = get_bedrock_client()
+
+    # Define the conversation as a list of messages
+    messages = [
+        {"role": "user", "content": f"Based on this: \n{prompt}\n{user_input}"}
+    ]
+    params = generation_params(llm_model_name)
+
+    # Prepare request payload based on the model
+    if "claude" in llm_model_name.lower():
         payload = json.dumps({
             "anthropic_version": "bedrock-2023-05-31",
             "messages": messages,
-            "max_tokens": 500,
-            "temperature": 0.5,
+            **params,
         })
-        
         # Invoke the model
         response = client.invoke_model(
-            modelId="anthropic.claude-3-sonnet-20240229-v1:0",
-            body=payload,
-            accept="application/json",
-            contentType="application/json"
-        )
+        modelId=llm_model_name,
+        body=payload,
+        accept="application/json",
+        contentType="application/json")
+
+        # Parse the response
+        response_body = json.loads(response['body'].read().decode("utf-8"))
+
+        result = response_body["content"][0]["text"] if "content" in response_body else "No details found."
+
+    elif "titan" in llm_model_name.lower():
+        # Prepare the payload for Titan model
+        input_text = f"{prompt}\n{user_input}"
+        payload = json.dumps({
+            "inputText": input_text,
+            "textGenerationConfig": params,
+        })
         
+        # Invoke the model
+        response = client.invoke_model(
+        modelId=llm_model_name,
+        body=payload,
+        accept="application/json",
+        contentType="application/json")
+
+        # Parse the response
         response_body = json.loads(response['body'].read().decode("utf-8"))
-        details = response_body["content"][0]["text"] if "content" in response_body else "No details found."
-        return details
-    
-    except Exception as e:
-        return f"Error retrieving material details: {str(e)}"
+        result = response_body.get("results", [{}])[0].get("outputText", "No output text found.")
 
-def call_llm(user_input, prompt, llm_model_name):
-    """
-    Calls a specified LLM model using AWS Bedrock's Messages API.
+    else:
 
-    Parameters:
-        user_input (str): The user's input question.
-        prompt (str): The prompt to provide context for the LLM.
-        llm_model_name (str): The name of the LLM model to invoke.
+        response = client.chat.completions.create(
+        model=llm_model_name,
+        messages=[
+            {"role": "system", "content": f"{prompt}"},
+            {"role": "user", "content": f"{user_input}"}
+        ],
+        **params)
 
-    Returns:
-        str: Generated text response from the model.
-    """
-    try:
-        if "gpt" in llm_model_name.lower():
-            # Create OpenAI client
-            client = OpenAI()
-            
-        else:
-            # Initialize the Bedrock runtime client
-            client = boto3.client(
-                'bedrock-runtime',
-                region_name=os.getenv('AWS_REGION'),  # Ensure the region is set
-                aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-                aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
-            )
+        result = response.choices[0].message.content.strip()
 
-        # Define the conversation as a list of messages
-        messages = [
-            {"role": "user", "content": f"Based on this: \n{prompt}\n{user_input}"}
-        ]
+    return result
 
-        # Prepare request payload based on the model
-        if "claude" in llm_model_name.lower():
-            payload = json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "messages": messages,
-                "max_tokens": 2048,  # Adjust as needed
-                "temperature": 0,
-            })
-            # Invoke the model
-            response = client.invoke_model(
+def _stream_llm(user_input, prompt, llm_model_name):
+    # Same requests as _invoke_llm, but yields text as the model produces it
+    messages = [
+        {"role": "user", "content": f"Based on this: \n{prompt}\n{user_input}"}
+    ]
+    params = generation_params(llm_model_name)
+    produced = False
+
+    if "claude" in llm_model_name.lower():
+        payload = json.dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "messages": messages,
+            **params,
+        })
+        response = get_bedrock_client().invoke_model_with_response_stream(
             modelId=llm_model_name,
             body=payload,
             accept="application/json",
             contentType="application/json")
 
-            # Parse the response
-            response_body = json.loads(response['body'].read().decode("utf-8"))
-
-            result = response_body["content"][0]["text"] if "content" in response_body else "No details found."
-
-        elif "titan" in llm_model_name.lower():
-            # Prepare the payload for Titan model
-            input_text = f"{prompt}\n{user_input}"
-            payload = json.dumps({
-                "inputText": input_text,
-                "textGenerationConfig": {
-                    "maxTokenCount": 3072,  # Set to the desired max token count
-                    "stopSequences": [],  # Add any stop sequences if needed
-                    "temperature": 0,  # Adjust temperature as needed
-                    "topP": 0.9  # Adjust topP as needed
-                }
-            })
-            
-            # Invoke the model
-            response = client.invoke_model(
+        for event in response["body"]:
+            chunk = json.loads(event["chunk"]["bytes"]) if "chunk" in event else {}
+            if chunk.get("type") == "content_block_delta":
+                text = chunk["delta"].get("text", "")
+                if text:
+                    produced = True
+                    yield text
+        if not produced:
+            yield "No details found."
+
+    elif "titan" in llm_model_name.lower():
+        input_text = f"{prompt}\n{user_input}"
+        payload = json.dumps({
+            "inputText": input_text,
+            "textGenerationConfig": params,
+        })
+        response = get_bedrock_client().invoke_model_with_response_stream(
             modelId=llm_model_name,
             body=payload,
             accept="application/json",
             contentType="application/json")
 
-            # Parse the response
-            response_body = json.loads(response['body'].read().decode("utf-8"))
-            result = response_body.get("results", [{}])[0].get("outputText", "No output text found.")
-
-        elif "gpt" in llm_model_name.lower():
-
-            response = client.chat.completions.create(
+        for event in response["body"]:
+            chunk = json.loads(event["chunk"]["bytes"]) if "chunk" in event else {}
+            text = chunk.get("outputText", "")
+            if text:
+                produced = True
+                yield text
+        if not produced:
+            yield "No output text found."
+
+    else:
+        stream = get_openai_client().chat.completions.create(
             model=llm_model_name,
             messages=[
                 {"role": "system", "content": f"{prompt}"},
                 {"role": "user", "content": f"{user_input}"}
             ],
-            temperature=0)
+            stream=True,
+            **params)
+
+        for chunk in stream:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if not produced and text:
+                # call_llm strips the answer; drop the leading whitespace here too
+                text = text.lstrip()
+            if text:
+                produced = True
+                yield text
+
+def _call_llm_or_raise(request, use_cache, refresh, ttl, deadline=None, hedge_model=LLM_HEDGE_MODEL):
+    user_input, prompt, llm_model_name = request
+    answered_by = [llm_model_name]
+
+    def invoke():
+        text, answered_by[0] = resilient_call(lambda model: _invoke_llm(user_input, prompt, model),
+                                              llm_model_name, deadline, hedge_model=hedge_model,
+                                              return_model=True)
+        return text
 
-            result = response.choices[0].message.content.strip()
+    try:
+        params = generation_params(llm_model_name)
+        # A hedged answer is cached under the model that gave it
+        return cached_call(
+            invoke, llm_model_name, prompt, user_input, params,
+            use_cache=use_cache, refresh=refresh, ttl=ttl,
+            answered_by=lambda: (answered_by[0], generation_params(answered_by[0])))
+    except Exception as e:
+        raise classify_error(e, llm_model_name) from e
 
-        else:
-            raise ValueError("Unsupported model specified.")
+def call_llm(user_input, prompt, llm_model_name, use_cache=True, refresh=False, ttl=None,
+             deadline=None, hedge_model=LLM_HEDGE_MODEL, raise_errors=False):
+    """
+    Calls a specified LLM model using AWS Bedrock's Messages API.
 
-       
-        return result
+    Parameters:
+        user_input (str): The user's input question.
+        prompt (str): The prompt to provide context for the LLM.
+        llm_model_name (str): The name of the LLM model to invoke.
+        use_cache (bool): Reuse a cached response for the same request.
+        refresh (bool): Skip the cached response and store a fresh one.
+        ttl (int): Seconds to keep the response cached (None = default).
+        deadline (float): Seconds before giving up, retries and hedge
+            included (None = LLM_DEADLINE).
+        hedge_model (str): Model to send a duplicate request to if the
+            first is slower than its p95 latency (None = no hedging).
+        raise_errors (bool): Raise LLMError instead of returning an error message.
 
-    except Exception as e:
+    Returns:
+        str: Generated text response from the model.
+    """
+    try:
+        return _call_llm_or_raise(LLMRequest(user_input, prompt, llm_model_name),
+                                  use_cache, refresh, ttl, deadline, hedge_model)
+
+    except LLMError as e:
+        if raise_errors:
+            raise
         return f"Error retrieving LLM response: {str(e)}"
 
+def stream_llm(user_input, prompt, llm_model_name, use_cache=True, refresh=False, ttl=None,
+               deadline=None, raise_errors=False):
+    """
+    Streaming variant of call_llm: yields the response in chunks as the
+    model generates it. Shares the response cache with call_llm, so a
+    cached answer is yielded at once as a single chunk.
+
+    Parameters:
+        user_input (str): The user's input question.
+        prompt (str): The prompt to provide context for the LLM.
+        llm_model_name (str): The name of the LLM model to invoke.
+        use_cache (bool): Reuse a cached response for the same request.
+        refresh (bool): Skip the cached response and store a fresh one.
+        ttl (int): Seconds to keep the response cached (None = default).
+        deadline (float): Seconds to wait for the first chunk, retries
+            included (None = LLM_DEADLINE).
+        raise_errors (bool): Raise LLMError instead of yielding an error message.
+
+    Yields:
+        str: Response text chunks; on failure, the same error message
+        call_llm would return.
+    """
+    try:
+        params = generation_params(llm_model_name)
+        yield from cached_stream(
+            lambda: resilient_stream(lambda model: _stream_llm(user_input, prompt, model),
+                                     llm_model_name, deadline),
+            llm_model_name, prompt, user_input, params,
+            use_cache=use_cache, refresh=refresh, ttl=ttl)
+
+    except Exception as e:
+        if raise_errors:
+            raise classify_error(e, llm_model_name) from e
+        yield f"Error retrieving LLM response: {str(e)}"
+
+def call_llm_many(requests, max_concurrency=LLM_MAX_CONCURRENCY, on_result=None,
+                  use_cache=True, refresh=False, ttl=None, deadline=None, hedge_model=LLM_HEDGE_MODEL):
+    """
+    Runs many call_llm requests concurrently on a thread pool.
+
+    Parameters:
+        requests (iterable): (user_input, prompt, llm_model_name) tuples.
+        max_concurrency (int): Most requests in flight at once.
+        on_result (callable): Called as on_result(index, LLMResult) as each
+            request finishes, on the caller's thread, so it may update
+            Streamlit elements.
+        use_cache, refresh, ttl, deadline, hedge_model: As for call_llm,
+            applied to every request.
+
+    Returns:
+        list: One LLMResult per request, in input order. A failed request
+        sets error to its LLMError instead of raising, so the others still
+        complete.
+    """
+    requests = [LLMRequest(*request) for request in requests]
+    results = [None] * len(requests)
+    if not requests:
+        return results
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(requests)))) as executor:
+        futures = {
+            executor.submit(_call_llm_or_raise, request, use_cache, refresh, ttl, deadline, hedge_model): index
+            for index, request in enumerate(requests)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = LLMResult(future.result(), None)
+            except LLMError as e:
+                results[index] = LLMResult(None, e)
+            if on_result is not None:
+                on_result(index, results[index])
+    return results
+
 # Example usage
 if __name__ == "__main__":
     material_info = get_material_details("PLA")
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from llm_cache import CACHE_DISABLED, get_cache, make_cache_key
+from llm_handler import LLMRequest, call_llm, generation_params
+
+# Speculative prefetch of LLM answers the user is likely to ask for next.
+# Off unless LLM_PREFETCH_TOP_K is set; answers land in the shared response
+# cache, so the real request is served from there.
+PREFETCH_TOP_K = int(os.getenv("LLM_PREFETCH_TOP_K", 0))
+PREFETCH_WORKERS = int(os.getenv("LLM_PREFETCH_WORKERS", 2))
+# Tokens the prefetcher may spend per budget window, across all sessions
+PREFETCH_TOKEN_BUDGET = int(os.getenv("LLM_PREFETCH_TOKEN_BUDGET", 50_000))
+PREFETCH_BUDGET_WINDOW = int(os.getenv("LLM_PREFETCH_BUDGET_WINDOW", 3600))    # seconds
+# Tokens reserved for each answer before its real length is known
+PREFETCH_OUTPUT_RESERVE = 512
+
+_executor = None
+_pending = {}       # cache key -> Future of a queued or running request
+_lock = threading.Lock()
+_budget = {"window_start": time.time(), "spent": 0}
+
+
+def estimate_tokens(text):
+    """
+    Rough token count (about four characters per token).
+    """
+    return len(text) // 4 + 1
+
+
+def _request_key(request):
+    return make_cache_key(request.llm_model_name, request.prompt, request.user_input,
+                          generation_params(request.llm_model_name))
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="llm-prefetch")
+    return _executor
+
+
+def _reserve(tokens):
+    # Caller holds _lock
+    now = time.time()
+    if now - _budget["window_start"] >= PREFETCH_BUDGET_WINDOW:
+        _budget.update(window_start=now, spent=0)
+    if _budget["spent"] + tokens > PREFETCH_TOKEN_BUDGET:
+        return False
+    _budget["spent"] += tokens
+    return True
+
+
+def _run(request, key):
+    try:
+        answer = call_llm(*request)
+        with _lock:
+            # Settle the reservation against the real answer length
+            _budget["spent"] += estimate_tokens(answer) - PREFETCH_OUTPUT_RESERVE
+        return answer
+    finally:
+        with _lock:
+            _pending.pop(key, None)
+
+
+def prefetch(requests):
+    """
+    Queues LLM requests on the background pool so their answers are cached
+    before anyone asks. Requests already cached or in flight are skipped,
+    and queuing stops once the token budget for the window is used up.
+
+    Parameters:
+        requests (iterable): LLMRequest or (user_input, prompt,
+            llm_model_name) tuples, most likely first.
+
+    Returns:
+        int: Number of requests queued.
+    """
+    if CACHE_DISABLED:
+        return 0
+
+    cache = get_cache()
+    queued = 0
+    for request in requests:
+        request = LLMRequest(*request)
+        key = _request_key(request)
+        if cache.contains(key):
+            continue
+        reserved = estimate_tokens(request.prompt + request.user_input) + PREFETCH_OUTPUT_RESERVE
+        with _lock:
+            if key in _pending:
+                continue
+            if not _reserve(reserved):
+                break
+            _pending[key] = _get_executor().submit(_run, request, key)
+        queued += 1
+    return queued
+
+
+def wait_for_prefetch(request, timeout=None):
+    """
+    Blocks until a prefetch of the same request finishes, so the caller
+    reads its answer from the cache instead of asking the model again.
+
+    Returns:
+        bool: True if a matching prefetch was in flight.
+    """
+    request = LLMRequest(*request)
+    with _lock:
+        future = _pending.get(_request_key(request))
+    if future is None:
+        return False
+    wait([future], timeout=timeout)
+    return True
+
+
+def prefetch_stats():
+    with _lock:
+        return {"pending": len(_pending), "tokens_spent": _budget["spent"],
+                "token_budget": PREFETCH_TOKEN_BUDGET}
@@ -0,0 +1,236 @@
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Bounds on how long one LLM request (all retries and hedges included) may
+# hold the caller, and how it retries
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", 60))                  # seconds
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 3))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", 0.5))         # seconds
+LLM_BACKOFF_CAP = float(os.getenv("LLM_BACKOFF_CAP", 8))             # seconds
+# Hedge after this long until enough latencies are recorded for a p95
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", 10))            # seconds
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+THROTTLING_CODES = {
+    "ThrottlingException", "TooManyRequestsException", "ServiceQuotaExceededException",
+    "ServiceUnavailableException", "ModelNotReadyException", "InternalServerException",
+    "ModelTimeoutException",
+}
+
+
+class LLMError(Exception):
+    """
+    Base class of the errors the LLM functions raise when asked to.
+    str() is the provider's message.
+    """
+
+    retryable = False
+
+    def __init__(self, message, model=None):
+        super().__init__(message)
+        self.model = model
+
+
+class LLMTimeoutError(LLMError):
+    """The deadline passed, or the provider stopped responding."""
+    retryable = True
+
+
+class LLMThrottledError(LLMError):
+    """The provider rejected the request for rate or capacity reasons."""
+    retryable = True
+
+
+class LLMServerError(LLMError):
+    """The provider failed with a 5xx or dropped the connection."""
+    retryable = True
+
+
+class LLMRequestError(LLMError):
+    """The request itself is invalid (bad model, auth, payload); retrying won't help."""
+
+
+def classify_error(error, model=None):
+    """
+    Maps a Bedrock/OpenAI/client exception to the matching LLMError.
+
+    Parameters:
+        error (Exception): What the provider call raised.
+        model (str): Model that was called, kept on the error.
+
+    Returns:
+        LLMError: Typed error; error itself if it already is one.
+    """
+    if isinstance(error, LLMError):
+        return error
+    # Imported here so loading this module does not pull in both SDKs
+    import openai
+    from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, ReadTimeoutError
+
+    message = str(error)
+
+    if isinstance(error, ClientError):
+        code = error.response.get("Error", {}).get("Code", "")
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode") or 0
+        if code in THROTTLING_CODES or status == 429:
+            return LLMThrottledError(message, model)
+        if status >= 500:
+            return LLMServerError(message, model)
+        return LLMRequestError(message, model)
+    if isinstance(error, (ReadTimeoutError, openai.APITimeoutError, TimeoutError)):
+        return LLMTimeoutError(message, model)
+    if isinstance(error, (BotoConnectionError, openai.APIConnectionError, ConnectionError)):
+        return LLMServerError(message, model)
+    if isinstance(error, openai.RateLimitError):
+        return LLMThrottledError(message, model)
+    if isinstance(error, openai.APIStatusError) and error.status_code >= 500:
+        return LLMServerError(message, model)
+    return LLMRequestError(message, model)
+
+
+_latencies = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+_latency_lock = threading.Lock()
+
+
+def record_latency(model, seconds):
+    with _latency_lock:
+        _latencies[model].append(seconds)
+
+
+def hedge_delay(model):
+    """
+    Seconds to wait for model before hedging: its observed p95 latency,
+    or LLM_HEDGE_AFTER until enough calls have been timed.
+    """
+    with _latency_lock:
+        samples = sorted(_latencies[model])
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return LLM_HEDGE_AFTER
+    return samples[int(0.95 * (len(samples) - 1))]
+
+
+def backoff_delay(attempt):
+    """
+    Full-jitter exponential backoff for the given retry (0-based).
+    """
+    return random.uniform(0, min(LLM_BACKOFF_CAP, LLM_BACKOFF_BASE * 2 ** attempt))
+
+
+# Attempts run here so the caller can stop waiting at its deadline; a late
+# attempt finishes in the background, bounded by the client read timeout
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("LLM_CALL_WORKERS", 32)),
+                               thread_name_prefix="llm-call")
+
+
+def _timed(invoke, model, timed):
+    started = time.monotonic()
+    result = invoke(model)
+    if timed:
+        record_latency(model, time.monotonic() - started)
+    return result
+
+
+def resilient_call(invoke, model, deadline=None, max_retries=None, hedge_model=None, timed=True,
+                   return_model=False):
+    """
+    Calls invoke(model) with a deadline, retries throttling, timeout and
+    5xx failures with jittered exponential backoff, and optionally hedges:
+    if the first attempt hasn't answered by the model's p95 latency, the
+    same request is also sent to hedge_model and the first answer wins.
+
+    Parameters:
+        invoke (callable): invoke(model) performs one request; returns str.
+        model (str): Model to call.
+        deadline (float): Seconds for the whole call (None = LLM_DEADLINE).
+        max_retries (int): Retries after the first attempt (None = LLM_MAX_RETRIES).
+        hedge_model (str): Model (or provider) for the hedged request.
+        timed (bool): Record successful latencies for the hedge delay.
+        return_model (bool): Also return which model answered.
+
+    Returns:
+        str: The first successful response; (response, model) with
+        return_model, model being hedge_model when the hedge won.
+
+    Raises:
+        LLMError: Typed failure of the last attempt, or LLMTimeoutError
+        once the deadline passes.
+    """
+    deadline_at = time.monotonic() + (LLM_DEADLINE if deadline is None else deadline)
+    max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+
+    attempt = 0
+    while True:
+        pending = {_executor.submit(_timed, invoke, model, timed): model}
+        hedged = hedge_model is None
+        error = None
+
+        while pending:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise LLMTimeoutError(f"No response within the {deadline or LLM_DEADLINE:g}s deadline", model)
+            timeout = remaining if hedged else min(remaining, hedge_delay(model))
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                if not hedged:
+                    pending[_executor.submit(_timed, invoke, hedge_model, timed)] = hedge_model
+                    hedged = True
+                continue
+
+            for future in done:
+                called = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = classify_error(e, called)
+                    continue
+                return (result, called) if return_model else result
+
+        if not error.retryable or attempt >= max_retries:
+            raise error
+        delay = backoff_delay(attempt)
+        if time.monotonic() + delay >= deadline_at:
+            raise error
+        time.sleep(delay)
+        attempt += 1
+
+
+def resilient_stream(start, model, deadline=None, max_retries=None):
+    """
+    Streaming counterpart of resilient_call. Failures before the first
+    chunk are retried with backoff until the deadline; once text has been
+    yielded the stream can't be replayed, so later failures are raised.
+
+    Parameters:
+        start (callable): start(model) opens the stream; returns an iterator of str.
+        model (str): Model to call.
+        deadline (float): Seconds to wait for the first chunk (None = LLM_DEADLINE).
+        max_retries (int): Retries after the first attempt (None = LLM_MAX_RETRIES).
+
+    Yields:
+        str: Response text chunks.
+
+    Raises:
+        LLMError: Typed failure.
+    """
+    stream = None
+
+    def first_chunk(model):
+        nonlocal stream
+        stream = iter(start(model))
+        return next(stream, None)
+
+    # Time to first chunk isn't a full-answer latency, so don't record it
+    first = resilient_call(first_chunk, model, deadline=deadline, max_retries=max_retries, timed=False)
+    if first is None:
+        return
+    yield first
+    try:
+        yield from stream
+    except Exception as e:
+        raise classify_error(e, model) from e
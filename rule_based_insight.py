@@ -1,20 +1,42 @@
 import streamlit as st
 import pandas as pd
-from llm_handler import call_llm
-import matplotlib.pyplot as plt
+from llm_handler import LLMRequest, stream_llm
+from llm_prefetch import wait_for_prefetch
+from shared_data import readonly, share
 
-@st.cache_data
+# One read-only copy per process; st.cache_data would unpickle a fresh copy per call
+@st.cache_resource(show_spinner=False)
 def load_polymer_blend_data():
     #file = "./Data_Rule_Based/Extended_Unified_Polymer_Model.xlsx"
     file = "./Data_Rule_Based/Biopolymer_Insight_Template_Filled.xlsx"
 
-    return pd.read_excel(file)
+    return share("blend template", pd.read_excel(file))
 
-from plotly.subplots import make_subplots
-import plotly.graph_objects as go
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+import numpy as np
 
+# plotly and openpyxl are imported where they are used, so the results page
+# does not pay for them until a Details panel is opened
 PLOT_SCALE = 1
 EXCEL_PATH = "./data/Bio_Dis_Data.xlsx"
+CURVE_KINDS = ("Bio", "Dis")
+
+log = logging.getLogger(__name__)
+
+# Built degradation figures, stored as plotly specs and shared by all sessions
+FIGURE_CACHE_SIZE = 32
+_figure_cache = OrderedDict()
+_figure_cache_lock = threading.Lock()
+_figure_cache_stats = {"hits": 0, "misses": 0}
+
+class Curve(NamedTuple):
+    time: np.ndarray   # float32, days
+    value: np.ndarray  # float32
+    label: str         # y-axis title from the sheet header
 
 def read_sheet_data(xls, sheet_name):
     df = pd.read_excel(xls, sheet_name=sheet_name, header=1)
@@ -24,19 +46,128 @@ def read_sheet_data(xls, sheet_name):
     df[df.columns[1]] = pd.to_numeric(df[df.columns[1]], errors='coerce')
     return df.dropna()
 
-def plot_ingredient(xls, ingredient_name):
-    bio_sheet = f"{ingredient_name}_Bio"
-    dis_sheet = f"{ingredient_name}_Dis"
+def _read_curve_sheets(path):
+    # Same cleaning as read_sheet_data, but only the two columns we plot are
+    # read, in one read-only pass over every <ingredient>_Bio/_Dis sheet
+    from openpyxl import load_workbook
 
+    wb = load_workbook(path, read_only=True, data_only=True)
+    curves = {}
     try:
-        df_bio = read_sheet_data(xls, bio_sheet)
-        df_dis = read_sheet_data(xls, dis_sheet)
-    except Exception as e:
+        for sheet_name in wb.sheetnames:
+            if sheet_name.rsplit("_", 1)[-1] not in CURVE_KINDS:
+                continue
+            rows = list(wb[sheet_name].iter_rows(min_row=2, max_col=2, values_only=True))
+            if not rows:
+                continue
+            header, data = rows[0], rows[1:]
+            label = str(header[1]).strip() if header[1] is not None else "Unnamed: 1"
+            time = pd.to_numeric(pd.Series([r[0] for r in data], dtype=object), errors='coerce')
+            value = pd.to_numeric(pd.Series([r[1] if len(r) > 1 else None for r in data], dtype=object), errors='coerce')
+            keep = time.notna() & value.notna()
+            curves[sheet_name] = Curve(
+                time[keep].to_numpy(dtype=np.float32),
+                value[keep].to_numpy(dtype=np.float32),
+                label,
+            )
+    finally:
+        wb.close()
+    return curves
+
+@st.cache_resource(show_spinner="Loading degradation data...")
+def load_curve_store(xls_path, source_mtime):
+    """
+    Parses every <ingredient>_Bio / <ingredient>_Dis sheet once into
+    float32 (time, value) arrays, shared by all sessions.
+
+    Parameters:
+        xls_path (str): Path to the Bio/Dis workbook.
+        source_mtime (float): Workbook mtime, so edits invalidate the store.
+
+    Returns:
+        dict: ingredient -> {"Bio": Curve, "Dis": Curve} (kinds present only).
+    """
+    curves = _read_curve_sheets(xls_path)
+
+    store = {}
+    for sheet_name, curve in curves.items():
+        ingredient, kind = sheet_name.rsplit("_", 1)
+        readonly(curve.time)
+        readonly(curve.value)
+        store.setdefault(ingredient, {})[kind] = curve
+    return share("degradation curves", store)
+
+def get_curves(xls_path, ingredient_name):
+    """
+    Looks up the Bio and Dis curves of an ingredient in the shared store.
+
+    Returns:
+        tuple: (bio Curve, dis Curve), or None if either is missing.
+    """
+    store = load_curve_store(xls_path, os.path.getmtime(xls_path))
+    curves = store.get(ingredient_name, {})
+    if not all(kind in curves for kind in CURVE_KINDS):
+        return None
+    return curves["Bio"], curves["Dis"]
+
+def figure_cache_info():
+    """
+    Hit/miss counters and occupancy of the degradation figure cache.
+    """
+    with _figure_cache_lock:
+        return dict(_figure_cache_stats, size=len(_figure_cache), maxsize=FIGURE_CACHE_SIZE)
+
+def get_ingredient_figure(xls, ingredient_name):
+    """
+    Returns the degradation figure of an ingredient, reusing the stored
+    figure spec when the same (ingredient, PLOT_SCALE, theme) was built
+    before from the same workbook.
+
+    Returns:
+        go.Figure or None: None when the ingredient has no Bio/Dis data.
+    """
+    theme = st.get_option("theme.base")
+    key = (ingredient_name, PLOT_SCALE, theme, xls, os.path.getmtime(xls))
+
+    with _figure_cache_lock:
+        spec = _figure_cache.get(key)
+        if spec is not None:
+            _figure_cache.move_to_end(key)
+            _figure_cache_stats["hits"] += 1
+        else:
+            _figure_cache_stats["misses"] += 1
+    if spec is not None:
+        import plotly.graph_objects as go
+
+        # The spec was produced by plotly itself, so skip re-validation
+        return go.Figure(spec, _validate=False)
+
+    curves = get_curves(xls, ingredient_name)
+    if curves is None:
+        return None
+    fig = build_ingredient_figure(*curves)
+
+    with _figure_cache_lock:
+        _figure_cache[key] = fig.to_dict()
+        _figure_cache.move_to_end(key)
+        while len(_figure_cache) > FIGURE_CACHE_SIZE:
+            _figure_cache.popitem(last=False)
+    return fig
+
+def plot_ingredient(xls, ingredient_name):
+    fig = get_ingredient_figure(xls, ingredient_name)
+    if fig is None:
         st.warning(f"📉 Data not available for **{ingredient_name}**.")
         return
 
-    y_bio = df_bio.columns[1]
-    y_dis = df_dis.columns[1]
+    st.plotly_chart(fig, use_container_width=True)
+
+def build_ingredient_figure(curve_bio, curve_dis):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    y_bio = curve_bio.label
+    y_dis = curve_dis.label
 
     fig = make_subplots(
         rows=1, cols=2,
@@ -45,8 +176,8 @@ def plot_ingredient(xls, ingredient_name):
 
     # Plot 1: Biodegradation
     fig.add_trace(go.Scatter(
-        x=df_bio["Time (day)"],
-        y=df_bio[y_bio],
+        x=curve_bio.time,
+        y=curve_bio.value,
         mode='lines+markers',
         name='Biodegradation',
         marker=dict(symbol='circle', size=6 * PLOT_SCALE, color='#1f77b4'),
@@ -55,8 +186,8 @@ def plot_ingredient(xls, ingredient_name):
 
     # Plot 2: Disintegration
     fig.add_trace(go.Scatter(
-        x=df_dis["Time (day)"],
-        y=df_dis[y_dis],
+        x=curve_dis.time,
+        y=curve_dis.value,
         mode='lines+markers',
         name='Disintegration',
         marker=dict(symbol='square', size=6 * PLOT_SCALE, color='#ff7f0e'),
@@ -95,7 +226,7 @@ def plot_ingredient(xls, ingredient_name):
     fig.update_yaxes(title_text=y_bio, showgrid=True, gridcolor='lightgrey', zeroline=False, row=1, col=1)
     fig.update_yaxes(title_text=y_dis, showgrid=True, gridcolor='lightgrey', zeroline=False, row=1, col=2)
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 # import plotly.graph_objects as go
 # from plotly.subplots import make_subplots
@@ -168,70 +299,52 @@ def plot_ingredient(xls, ingredient_name):
 #     fig.update_xaxes(title_text="Time (day)", showgrid=True, gridcolor='lightgrey', zeroline=False, row=1, col=2)
 #     fig.update_yaxes(title_text=y_dis, showgrid=True, gridcolor='lightgrey', zeroline=False, row=1, col=2)
 
-def show_polymer_blend_insights(polymer_name: str, key_prefix: str):
-    import streamlit as st
-    import pandas as pd
-
-    # Load data
-    data = load_polymer_blend_data()
-
-    # Predefined category code → readable name
-    category_mapping = {
-        "MECH": "Mechanical",
-        "THERM": "Thermal",
-        "BARRIER": "Barrier",
-        "COMPAT": "Compatibilization",
-        "BIO": "Biodegradability",
-        "PROC": "Processing",
-        "COST": "Cost Optimization"
-    }
-
-    # --- User selects a category ---
-    selected_display_name = st.selectbox(
-        "Select Optimization Category",
-        list(category_mapping.values()),
-        key=f"{key_prefix}_category"
-    )
-    selected_code = next((code for code, name in category_mapping.items() if name == selected_display_name), None)
-
-    # --- Filter the DataFrame ---
-    filtered_df = data[
-        (data["Base Polymer"].str.upper() == polymer_name.upper()) &
-        (data["Category (Property)"].str.contains(selected_code, na=False))
-    ].reset_index(drop=True)
-
-    if filtered_df.empty:
-        st.warning("⚠️ No blend insights found for this polymer and category.")
-        return
-
-    # --- Define fields to show ---
-    display_cols = [
-        "Ingredient", "Interaction Type", "Category (Property)", "Positive Effect", "Negative Effect",
-        "Compatibility Type", "Recommended wt%", "Base Polymer Max wt%", "Max Processing Temp (°C)",
-        "Max Compostability (%)", "Processing Notes", "Known Limitations", "Erthos Insight"
-    ]
-
+# Predefined category code → readable name
+CATEGORY_MAPPING = {
+    "MECH": "Mechanical",
+    "THERM": "Thermal",
+    "BARRIER": "Barrier",
+    "COMPAT": "Compatibilization",
+    "BIO": "Biodegradability",
+    "PROC": "Processing",
+    "COST": "Cost Optimization"
+}
+
+# --- Fields shown in the blend table ---
+BLEND_DISPLAY_COLS = [
+    "Ingredient", "Interaction Type", "Category (Property)", "Positive Effect", "Negative Effect",
+    "Compatibility Type", "Recommended wt%", "Base Polymer Max wt%", "Max Processing Temp (°C)",
+    "Max Compostability (%)", "Processing Notes", "Known Limitations", "Erthos Insight"
+]
+
+class BlendIndex(NamedTuple):
+    data: pd.DataFrame  # the insight template
+    positions: dict     # (BASE POLYMER, category code) -> row positions in data
+    tables: dict        # (BASE POLYMER, category code) -> rendered HTML table
+
+def render_blend_table(rows_df):
     # --- Create HTML rows for one row per additive ---
     html_header = "".join(
         f"<th style='padding: 10px; border: 1px solid #ddd; background-color: #8942E5; color: white;'>{col}</th>"
-        for col in display_cols + ["Reference"]
+        for col in BLEND_DISPLAY_COLS + ["Reference"]
     )
 
     html_rows = ""
-    for _, row in filtered_df.iterrows():
+    for _, row in rows_df.iterrows():
         html_cells = ""
-        for col in display_cols:
+        for col in BLEND_DISPLAY_COLS:
             val = row.get(col, "—") if pd.notna(row.get(col)) else "—"
             html_cells += f"<td style='padding: 10px; border: 1px solid #ddd;'>{val}</td>"
 
-        ref = row.get("Reference", "").strip()
+        ref = row.get("Reference", "")
+        ref = ref.strip() if isinstance(ref, str) else ""
         link_html = f"<a href='{ref}' target='_blank' style='color:#4a90e2;'>View</a>" if ref else "—"
         html_cells += f"<td style='padding: 10px; border: 1px solid #ddd;'>{link_html}</td>"
 
         html_rows += f"<tr>{html_cells}</tr>"
 
     # --- Final styled table ---
-    html_table = f"""
+    return f"""
     <div style='margin-top: 20px; overflow-x: auto;'>
     <table style='width: 100%; border-collapse: collapse; font-family: Arial, sans-serif; font-size: 14px;'>
         <thead>
@@ -246,6 +359,118 @@ def show_polymer_blend_insights(polymer_name: str, key_prefix: str):
     </div>
     """
 
+@st.cache_resource(show_spinner=False)
+def load_blend_index():
+    """
+    Parses the multi-code 'Category (Property)' field of every template
+    row into a code set once, and maps each (base polymer, code) pair to
+    its rows and rendered table. Shared by all sessions.
+
+    Returns:
+        BlendIndex: The template, row positions and rendered tables.
+    """
+    data = load_polymer_blend_data().reset_index(drop=True)
+
+    positions = {}
+    for position, (base, field) in enumerate(zip(data["Base Polymer"], data["Category (Property)"])):
+        if not isinstance(base, str) or not isinstance(field, str):
+            continue
+        # Same matching as the per-render substring filter it replaces
+        for code in CATEGORY_MAPPING:
+            if code in field:
+                positions.setdefault((base.upper(), code), []).append(position)
+
+    positions = {key: readonly(np.array(rows)) for key, rows in positions.items()}
+    tables = share("blend tables", {key: render_blend_table(data.iloc[rows]) for key, rows in positions.items()})
+    return BlendIndex(data, positions, tables)
+
+def blend_insight_request(polymer_name, row, category_display_name):
+    """
+    Builds the LLM question asked by the Insights panel for one additive,
+    so speculative prefetches produce exactly the same cache key.
+
+    Parameters:
+        polymer_name (str): Base polymer shown in the panel.
+        row (pd.Series): Blend template row of the chosen additive.
+        category_display_name (str): Selected optimization category.
+
+    Returns:
+        LLMRequest: (user_input, prompt, llm_model_name).
+    """
+    reference = row.get("Reference", "")
+    reference = reference.strip() if isinstance(reference, str) else ""
+    if reference:
+        prompt = (
+            f"Based on the paper at {reference}, explain how blending {row['Ingredient']} with {polymer_name} "
+            f"enhances its {category_display_name.lower()} properties. Mention mechanisms and experimental outcomes if relevant."
+            f"If the paper is not relevant to the question, just Explain how blending {row['Ingredient']} with {polymer_name} improves its {category_display_name.lower()} properties."
+            f"Discuss common mechanisms such as flexibility enhancement, crystallinity improvement, adhesion, or barrier performance."
+
+        )
+    else:
+        prompt = (
+            f"Explain how blending {row['Ingredient']} with {polymer_name} improves its {category_display_name.lower()} properties. "
+            f"Discuss common mechanisms such as flexibility enhancement, crystallinity improvement, adhesion, or barrier performance."
+        )
+
+    return LLMRequest(
+        user_input=f"How does {row['Ingredient']} improve {polymer_name} for {category_display_name}?",
+        prompt=prompt,
+        llm_model_name="gpt-4",
+    )
+
+def default_insight_requests(polymer_names, additives_per_polymer=1):
+    """
+    The Insights panel questions a user gets by opening each polymer and
+    keeping the default category and the first additive(s).
+
+    Parameters:
+        polymer_names (list): Base polymers, most likely first.
+        additives_per_polymer (int): Additives to include per polymer.
+
+    Returns:
+        list: LLMRequest per question, in polymer order. A polymer whose
+        questions cannot be built is logged and left out, since this runs
+        while the results page renders.
+    """
+    index = load_blend_index()
+    default_code, default_name = next(iter(CATEGORY_MAPPING.items()))
+    requests = []
+    for polymer_name in polymer_names:
+        rows = index.positions.get((polymer_name.upper(), default_code))
+        if rows is None:
+            continue
+        try:
+            requests += [blend_insight_request(polymer_name, row, default_name)
+                         for _, row in index.data.iloc[rows[:additives_per_polymer]].iterrows()]
+        except Exception:
+            log.exception("Skipping insight prefetch for %s", polymer_name)
+    return requests
+
+def show_polymer_blend_insights(polymer_name: str, key_prefix: str):
+    import streamlit as st
+    import pandas as pd
+
+    # Load data
+    index = load_blend_index()
+
+    # --- User selects a category ---
+    selected_display_name = st.selectbox(
+        "Select Optimization Category",
+        list(CATEGORY_MAPPING.values()),
+        key=f"{key_prefix}_category"
+    )
+    selected_code = next((code for code, name in CATEGORY_MAPPING.items() if name == selected_display_name), None)
+
+    # --- Look up the matching rows ---
+    key = (polymer_name.upper(), selected_code)
+    if key not in index.positions:
+        st.warning("⚠️ No blend insights found for this polymer and category.")
+        return
+
+    filtered_df = index.data.iloc[index.positions[key]].reset_index(drop=True)
+    html_table = index.tables[key]
+
     # st.markdown("### 📊 Blend Recommendations (Styled Table)", unsafe_allow_html=True)
     st.markdown(html_table, unsafe_allow_html=True)
 
@@ -253,30 +478,26 @@ def show_polymer_blend_insights(polymer_name: str, key_prefix: str):
     st.markdown("### 🔍 Deep Dive into a Specific Additive")
     selected_additive = st.selectbox("Choose an additive for insight", filtered_df["Ingredient"].tolist(), key=f"{key_prefix}_additive")
     selected_row = filtered_df[filtered_df["Ingredient"] == selected_additive].iloc[0]
-    reference = selected_row.get("Reference", "").strip()
+    request = blend_insight_request(polymer_name, selected_row, selected_display_name)
 
     # --- Trigger LLM insight ---
+    refresh = st.checkbox("Ignore cached insight", key=f"{key_prefix}_refresh_llm")
     if st.button("Generate LLM Insight", key=f"{key_prefix}_generate_llm"):
-        if reference:
-            prompt = (
-                f"Based on the paper at {reference}, explain how blending {selected_row['Ingredient']} with {polymer_name} "
-                f"enhances its {selected_display_name.lower()} properties. Mention mechanisms and experimental outcomes if relevant."
-                f"If the paper is not relevant to the question, just Explain how blending {selected_row['Ingredient']} with {polymer_name} improves its {selected_display_name.lower()} properties."
-                f"Discuss common mechanisms such as flexibility enhancement, crystallinity improvement, adhesion, or barrier performance."
+        if not refresh:
+            # A speculative prefetch of this exact question may be running
+            wait_for_prefetch(request)
 
-            )
-        else:
-            prompt = (
-                f"Explain how blending {selected_row['Ingredient']} with {polymer_name} improves its {selected_display_name.lower()} properties. "
-                f"Discuss common mechanisms such as flexibility enhancement, crystallinity improvement, adhesion, or barrier performance."
-            )
+        # Stream the answer into the insight box as it is generated
+        insight_box = st.empty()
+        explanation = ""
+        for chunk in stream_llm(*request, refresh=refresh):
+            explanation += chunk
+            insight_box.markdown(_insight_html(explanation + " ▌"), unsafe_allow_html=True)
+        insight_box.markdown(_insight_html(explanation), unsafe_allow_html=True)
 
-        explanation = call_llm(
-            user_input=f"How does {selected_additive} improve {polymer_name} for {selected_display_name}?",
-            prompt=prompt,
-            llm_model_name="gpt-4"
-        )
-        st.markdown(f"""
+
+def _insight_html(explanation):
+    return f"""
         <div style='
             border: 2px solid #8942E5;              /* Border thickness & color */
             background-color: #f8f6ff;              /* Light background */
@@ -290,7 +511,7 @@ def show_polymer_blend_insights(polymer_name: str, key_prefix: str):
             <strong style='font-size: 16px;'>🤖 LLM Insight</strong><br><br>
             {explanation}
         </div>
-        """, unsafe_allow_html=True)
+        """
 
 
 
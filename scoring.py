@@ -0,0 +1,193 @@
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+# (check name, catalog column, filters key) for every range criterion,
+# in the order the results table expects the *_Check columns
+RANGE_CRITERIA = [
+    ("Tensile Strength", "Tensile Strength-n", "tensile"),
+    ("Elongation at Break", "Elongation at Break-n", "elongation"),
+    ("WVTR", "WVTR", "wvtr"),
+    ("WVTR-2", "WVTR-2", "wvtr"),
+    ("Cost", "Cost", "cost"),
+    ("BBC", "BBC", "bbc"),
+]
+
+
+def range_mask(values, bounds):
+    """
+    lo <= value <= hi over a whole column; NaN never passes.
+    """
+    values = np.asarray(values, dtype=float)
+    low, high = bounds
+    return (values >= low) & (values <= high)
+
+
+def _per_unique_mask(series, predicate):
+    # Evaluate a Python predicate once per distinct value, then gather
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    unique_result = np.fromiter((predicate(v) for v in uniques), dtype=bool, count=len(uniques))
+    return unique_result[codes]
+
+
+def certs_mask(df, certs):
+    """
+    True where every requested certification is listed in 'Compostability'.
+    """
+    if "Compostability" not in df.columns:
+        return np.full(len(df), not certs, dtype=bool)
+
+    def has_certs(value):
+        row_certs = [c.strip() for c in str(value).split(",") if c.strip()]
+        return all(cert in row_certs for cert in certs)
+
+    return _per_unique_mask(df["Compostability"], has_certs)
+
+
+def geo_mask(df, geos):
+    """
+    True where the grade's 'Continent' is in the selected geographies.
+    """
+    if "Continent" not in df.columns:
+        return np.full(len(df), "" in geos, dtype=bool)
+    return _per_unique_mask(df["Continent"], lambda value: value in geos)
+
+
+_RANGE_COLUMNS = {name: column for name, column, _ in RANGE_CRITERIA}
+
+# Masks kept per session for incremental re-ranking
+MASK_CACHE_LIMIT = 64
+
+
+def criterion_bounds(filters):
+    """
+    Maps every active criterion to a hashable form of its filter bounds.
+
+    Parameters:
+        filters (dict): The input page selections (st.session_state.filters).
+
+    Returns:
+        dict: Check name -> bounds, in results-table order.
+    """
+    bounds = {}
+    for name, _, key in RANGE_CRITERIA:
+        bounds[name] = tuple(filters[key])
+
+    bounds["Compostability"] = tuple(filters.get('certs', []))
+
+    if filters['geos']:
+        geos = filters["geos"]
+        bounds["Continent"] = geos if isinstance(geos, str) else tuple(geos)
+    return bounds
+
+
+def filters_key(filters):
+    """
+    Short stable hash of the filter selections, for cache keys.
+    """
+    payload = json.dumps(filters, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def compute_mask(df, name, bounds):
+    """
+    Computes the boolean mask of a single criterion.
+    """
+    if name == "Compostability":
+        return certs_mask(df, bounds)
+    if name == "Continent":
+        return geo_mask(df, bounds)
+    return range_mask(df[_RANGE_COLUMNS[name]], bounds)
+
+
+def criterion_masks(df, filters):
+    """
+    Computes one boolean mask per ranking criterion.
+
+    Parameters:
+        df (pd.DataFrame): The catalog ranking table.
+        filters (dict): The input page selections (st.session_state.filters).
+
+    Returns:
+        dict: Check name -> np.ndarray of bool, in results-table order.
+    """
+    return {name: compute_mask(df, name, bounds) for name, bounds in criterion_bounds(filters).items()}
+
+
+def _scores_frame(df, score, masks):
+    result = {"Score": score.copy()}
+    for name, mask in masks.items():
+        result[f"{name}_Check"] = mask
+    return pd.DataFrame(result, index=df.index)
+
+
+def score_catalog(df, filters):
+    """
+    Scores every grade against the filters in one vectorized pass.
+
+    Parameters:
+        df (pd.DataFrame): The catalog ranking table.
+        filters (dict): The input page selections (st.session_state.filters).
+
+    Returns:
+        pd.DataFrame: 'Score' plus one '<criterion>_Check' column per
+        criterion, aligned with df's index.
+    """
+    masks = criterion_masks(df, filters)
+    score = np.zeros(len(df), dtype=np.int64)
+    for mask in masks.values():
+        score += mask
+    return _scores_frame(df, score, masks)
+
+
+def score_incremental(df, filters, catalog_version, state):
+    """
+    Same result as score_catalog, but only recomputes the criteria whose
+    bounds changed since the previous call and updates Score by delta.
+
+    Parameters:
+        df (pd.DataFrame): The catalog ranking table.
+        filters (dict): The input page selections (st.session_state.filters).
+        catalog_version (str): Version of the catalog df was loaded from.
+        state (dict): Per-session ranking state, e.g. a dict kept in
+            st.session_state; filled in by this function.
+
+    Returns:
+        pd.DataFrame: 'Score' plus one '<criterion>_Check' column per
+        criterion, aligned with df's index.
+    """
+    if state.get("catalog_version") != catalog_version or len(state.get("score", ())) != len(df):
+        state.clear()
+        state.update(
+            catalog_version=catalog_version,
+            score=np.zeros(len(df), dtype=np.int64),
+            active={},      # check name -> cache key currently counted in score
+            cache={},       # (check name, bounds, catalog version) -> mask
+        )
+
+    score, active, cache = state["score"], state["active"], state["cache"]
+    bounds = criterion_bounds(filters)
+
+    for name in [name for name in active if name not in bounds]:
+        score -= cache[active.pop(name)]
+
+    masks = {}
+    for name, criterion in bounds.items():
+        key = (name, criterion, catalog_version)
+        if key not in cache:
+            if len(cache) >= MASK_CACHE_LIMIT:
+                stale = next(k for k in cache if k not in active.values())
+                del cache[stale]
+            cache[key] = compute_mask(df, name, criterion)
+
+        previous = active.get(name)
+        if previous != key:
+            if previous is not None:
+                score -= cache[previous]
+            score += cache[key]
+            active[name] = key
+        masks[name] = cache[key]
+
+    return _scores_frame(df, score, masks)
@@ -0,0 +1,132 @@
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from catalog import load_catalog
+
+# Large read-only data (catalog, blend template, degradation curves) is
+# loaded once per process and shared by every session. Loaders register
+# what they hold here so the admin memory readout can account for it
+# next to the per-session state.
+SESSION_REPORT_TTL = 30 * 60        # seconds before an idle session drops out of the report
+
+_shared = {}            # name -> shared object
+_sessions = {}          # session id -> (user, bytes, last seen)
+_registry_lock = threading.Lock()
+
+
+def readonly(array):
+    """
+    Marks a numpy array read-only in place, so a session cannot change data
+    other sessions see. Returns the array.
+    """
+    array.flags.writeable = False
+    return array
+
+
+def share(name, obj):
+    """
+    Registers a process-wide shared object under a display name for the
+    memory readout. Returns obj.
+    """
+    with _registry_lock:
+        _shared[name] = obj
+    return obj
+
+
+def deep_nbytes(obj, _seen=None):
+    """
+    Estimated bytes held by obj, following DataFrames, arrays and the
+    containers around them; objects reachable twice are counted once.
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_nbytes(key, seen) + deep_nbytes(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_nbytes(item, seen) for item in obj)
+    return size
+
+
+@st.cache_resource(max_entries=2, show_spinner="Loading polymer catalog...")
+def _load_shared_catalog(data_file, mtime_ns, size):
+    return share("catalog", load_catalog(data_file))
+
+
+def get_shared_catalog(data_file):
+    """
+    The catalog held once per process, reloaded when the workbook changes.
+
+    Parameters:
+        data_file (str): Path to the polymer database workbook.
+
+    Returns:
+        Catalog: Shallow copies of the shared frames. With pandas
+        copy-on-write they share the data, and a session that changes
+        its copy gets private columns instead of changing everyone's.
+    """
+    stat = os.stat(data_file)
+    catalog = _load_shared_catalog(data_file, stat.st_mtime_ns, stat.st_size)
+    return catalog._replace(
+        df=catalog.df.copy(deep=False),
+        df_total=catalog.df_total.copy(deep=False),
+        parse_failures=catalog.parse_failures.copy(deep=False),
+    )
+
+
+def record_session_memory(user=None):
+    """
+    Notes the size of the current session's st.session_state for the
+    memory readout; call once per rerun.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    state = {key: st.session_state[key] for key in st.session_state}
+    now = time.time()
+    with _registry_lock:
+        _sessions[ctx.session_id] = (user, deep_nbytes(state), now)
+        for session_id in [sid for sid, (_, _, seen) in _sessions.items() if now - seen > SESSION_REPORT_TTL]:
+            del _sessions[session_id]
+
+
+def shared_memory_report():
+    """
+    Returns:
+        pd.DataFrame: Bytes held by each shared object, largest first.
+    """
+    with _registry_lock:
+        shared = dict(_shared)
+    rows = [{"object": name, "bytes": deep_nbytes(obj)} for name, obj in shared.items()]
+    return pd.DataFrame(rows, columns=["object", "bytes"]).sort_values("bytes", ascending=False, ignore_index=True)
+
+
+def session_memory_report():
+    """
+    Returns:
+        pd.DataFrame: Session-state bytes of each recently active session,
+        largest first.
+    """
+    with _registry_lock:
+        sessions = dict(_sessions)
+    rows = [{"session": session_id[:8], "user": user, "bytes": size,
+             "idle_s": round(time.time() - seen)}
+            for session_id, (user, size, seen) in sessions.items()]
+    return pd.DataFrame(rows, columns=["session", "user", "bytes", "idle_s"]) \
+        .sort_values("bytes", ascending=False, ignore_index=True)
@@ -0,0 +1,116 @@
+import io
+import os
+
+import pandas as pd
+
+# Result tables are serialized once, into memory, and the same bytes go to
+# the download button and the feedback uploader. Tables above
+# STREAMING_ROWS are written chunk by chunk so the writer never holds a
+# second full copy of the table next to the output.
+STREAMING_ROWS = int(os.getenv("EXPORT_STREAMING_ROWS", "20000"))
+CHUNK_ROWS = 5000
+
+EXPORT_FORMATS = {
+    "xlsx": ("Excel (.xlsx)", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": ("CSV (.csv)", "text/csv"),
+    "parquet": ("Parquet (.parquet)", "application/vnd.apache.parquet"),
+}
+
+
+def _chunks(df, chunk_rows):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _write_xlsx(df, fileobj, streaming, chunk_rows):
+    if not streaming:
+        df.to_excel(fileobj, index=False, engine="openpyxl")
+        return
+    from openpyxl import Workbook
+
+    # Write-only workbooks stream rows to a temporary file instead of
+    # keeping a cell object per value
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append([str(col) for col in df.columns])
+    for chunk in _chunks(df, chunk_rows):
+        for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(fileobj)
+
+
+def _write_csv(df, fileobj, streaming, chunk_rows):
+    text = io.TextIOWrapper(fileobj, encoding="utf-8", newline="", write_through=True)
+    try:
+        if not streaming:
+            df.to_csv(text, index=False)
+            return
+        for i, chunk in enumerate(_chunks(df, chunk_rows)):
+            chunk.to_csv(text, index=False, header=i == 0)
+    finally:
+        # Leave the caller's file object open
+        text.detach()
+
+
+def _write_parquet(df, fileobj, streaming, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # One schema for the whole table, so chunks with only missing values
+    # in a column still match
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(fileobj, schema) as writer:
+        for chunk in (_chunks(df, chunk_rows) if streaming else [df]):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+_WRITERS = {"xlsx": _write_xlsx, "csv": _write_csv, "parquet": _write_parquet}
+
+
+def write_table(df, fmt, fileobj, streaming=None, chunk_rows=CHUNK_ROWS):
+    """
+    Writes a table to a binary file object.
+
+    Parameters:
+        df (pd.DataFrame): The table; the index is not written.
+        fmt (str): One of EXPORT_FORMATS.
+        fileobj: Writable binary file object (left open).
+        streaming (bool): Write in chunks of chunk_rows (default: tables
+            longer than STREAMING_ROWS).
+        chunk_rows (int): Rows per chunk when streaming.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {sorted(_WRITERS)}")
+    if streaming is None:
+        streaming = len(df) > STREAMING_ROWS
+    _WRITERS[fmt](df, fileobj, streaming, chunk_rows)
+
+
+def export_table(df, fmt="xlsx", streaming=None):
+    """
+    Serializes a table in memory.
+
+    Parameters:
+        df (pd.DataFrame): The table.
+        fmt (str): One of EXPORT_FORMATS.
+        streaming (bool): See write_table.
+
+    Returns:
+        bytes: The file contents.
+    """
+    buffer = io.BytesIO()
+    write_table(df, fmt, buffer, streaming=streaming)
+    return buffer.getvalue()
+
+
+def read_table(path):
+    """
+    Reads back a table written by write_table, picking the format from the
+    file extension.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return pd.read_csv(path)
+    if ext == ".parquet":
+        return pd.read_parquet(path, engine="pyarrow")
+    return pd.read_excel(path)